@@ -0,0 +1,148 @@
+import copy
+import json
+import os
+import tempfile
+
+from benchmarks import synthetic
+from benchmarks.registry import benchmark
+
+
+def session_data(n_requests, n_trips):
+    from dash_app.custom_component import JsonUploader, XlsxUploader
+    vrp_input = synthetic.make_vrp_input(n_requests=n_requests)
+    data, _ = JsonUploader(name="JSON Input", _index="bench-json").parse_contents(synthetic.json_upload(vrp_input), "input.json")
+    data = json.loads(json.dumps(data))
+    sheet = synthetic.make_manual_sheet(vrp_input, n_trips=n_trips)
+    data, _ = XlsxUploader(name="Excel Manual", _index="bench-excel").parse_contents(synthetic.csv_upload(sheet), "manual.csv", data)
+    return json.loads(json.dumps(data))
+
+
+@benchmark("JsonUploader.parse_contents", n_requests=1000, n_locations=100)
+def json_uploader_parse(n_requests, n_locations):
+    from dash_app.custom_component import JsonUploader
+    from dash_app.custom_component import UPLOAD_CACHE
+    uploader = JsonUploader(name="JSON Input", _index="bench-json")
+    contents = synthetic.json_upload(synthetic.make_vrp_input(n_locations=n_locations, n_requests=n_requests))
+    return (lambda: uploader.parse_contents(contents, "input.json")), (lambda: UPLOAD_CACHE.clear() or ())
+
+
+@benchmark("JsonUploader.parse_contents[cached]", n_requests=1000, n_locations=100)
+def json_uploader_parse_cached(n_requests, n_locations):
+    from dash_app.custom_component import JsonUploader
+    uploader = JsonUploader(name="JSON Input", _index="bench-json")
+    contents = synthetic.json_upload(synthetic.make_vrp_input(n_locations=n_locations, n_requests=n_requests))
+    uploader.parse_contents(contents, "input.json")
+    return (lambda: uploader.parse_contents(contents, "input.json")), None
+
+
+@benchmark("XlsxUploader.parse_contents", n_requests=1000, n_trips=100)
+def xlsx_uploader_parse(n_requests, n_trips):
+    from dash_app.custom_component import JsonUploader, XlsxUploader
+    vrp_input = synthetic.make_vrp_input(n_requests=n_requests)
+    data, _ = JsonUploader(name="JSON Input", _index="bench-json").parse_contents(synthetic.json_upload(vrp_input), "input.json")
+    serialized = json.dumps(data)
+    contents = synthetic.csv_upload(synthetic.make_manual_sheet(vrp_input, n_trips=n_trips))
+    uploader = XlsxUploader(name="Excel Manual", _index="bench-excel")
+    return (lambda cur_data: uploader.parse_contents(contents, "manual.csv", cur_data)), (lambda: (dict(json.loads(serialized), inputDigest=None),))
+
+
+@benchmark("XlsxUploader.parse_contents[cached]", n_requests=1000, n_trips=100)
+def xlsx_uploader_parse_cached(n_requests, n_trips):
+    from dash_app.custom_component import JsonUploader, XlsxUploader
+    vrp_input = synthetic.make_vrp_input(n_requests=n_requests)
+    data, _ = JsonUploader(name="JSON Input", _index="bench-json").parse_contents(synthetic.json_upload(vrp_input), "input.json")
+    serialized = json.dumps(data)
+    contents = synthetic.csv_upload(synthetic.make_manual_sheet(vrp_input, n_trips=n_trips))
+    uploader = XlsxUploader(name="Excel Manual", _index="bench-excel")
+    uploader.parse_contents(contents, "manual.csv", json.loads(serialized))
+    return (lambda cur_data: uploader.parse_contents(contents, "manual.csv", cur_data)), (lambda: (json.loads(serialized),))
+
+
+@benchmark("Downloader.get_json[route]", n_requests=1000, n_trips=100)
+def downloader_get_json_route(n_requests, n_trips):
+    from dash_app.custom_component import Downloader
+    data = session_data(n_requests, n_trips)
+    return (lambda cur_data: Downloader.get_json("0", cur_data)), (lambda: (copy.deepcopy(data),))
+
+
+@benchmark("Downloader.get_json[all]", n_requests=1000, n_trips=100)
+def downloader_get_json_all(n_requests, n_trips):
+    from dash_app.custom_component import Downloader
+    data = session_data(n_requests, n_trips)
+    return (lambda cur_data: Downloader.get_json("all", cur_data)), (lambda: (copy.deepcopy(data),))
+
+
+@benchmark("route_export.export_archive", n_requests=1000, n_trips=100)
+def route_export_archive(n_requests, n_trips):
+    from dash_app.custom_component.route_export import export_archive
+    data = session_data(n_requests, n_trips)
+    return (lambda: export_archive(data, "bench")), None
+
+
+@benchmark("feasibility.check_feasibility", n_requests=4000, n_trips=2000)
+def feasibility_check(n_requests, n_trips):
+    from dash_app.custom_component.feasibility import check_feasibility
+    data = session_data(n_requests, n_trips)
+    return (lambda: (lambda result: (result.assignment(), result.violations()))(check_feasibility(data))), None
+
+
+def grid_crud(n_rows):
+    from dash_app.custom_component import components, GridCRUD
+    data_path = tempfile.mkdtemp(prefix="bench-grid-")
+    with open(os.path.join(data_path, "items.csv"), "w") as f:
+        f.write(synthetic.make_grid_csv(n_rows))
+    with open(f"{components.DATA_PATH}item_define.json") as src, open(os.path.join(data_path, "item_define.json"), "w") as dst:
+        dst.write(src.read())
+    components.DATA_PATH = f"{data_path}/"
+    return GridCRUD(name="Item", _index="bench-grid", grid_define_source="item_define.json", data_source="items.csv")
+
+
+@benchmark("GridCRUD.get_data", n_rows=5000)
+def grid_get_data(n_rows):
+    grid = grid_crud(n_rows)
+    return grid.get_data, None
+
+
+@benchmark("GridCRUD.save_data", n_rows=5000)
+def grid_save_data(n_rows):
+    grid = grid_crud(n_rows)
+    rows = grid.get_data()
+    save = grid.save_data()
+    return (lambda: save(1, rows)), None
+
+
+@benchmark("LiveUpdateFigure.update_figure", window_size=360)
+def live_update_figure(window_size):
+    from dash_app.custom_component import LiveUpdateFigure
+    monitor = LiveUpdateFigure(name="Live Update", _index="bench-live", window_size=window_size)
+    update = monitor.update_figure()
+    counter = iter(range(10**9))
+    return (lambda: update(next(counter))), None
+
+
+def distance_error(n_locations, n_errors):
+    from dash_app.custom_component import DistanceMatrixError
+    from dash_app.custom_component.distance_analytics import DistanceErrorAnalytics
+    component = DistanceMatrixError(name="Distance Error", _index="bench-dm")
+    component.error_data, component.locations = synthetic.make_error_frames(n_locations, n_errors)
+    component.analytics = DistanceErrorAnalytics(component.error_data, component.locations)
+    return component
+
+
+@benchmark("DistanceMatrixError.draw_line_chart", n_locations=5000, n_errors=100000)
+def draw_line_chart(n_locations, n_errors):
+    component = distance_error(n_locations, n_errors)
+    return component.draw_line_chart, None
+
+
+@benchmark("DistanceMatrixError.draw_map_chart", n_locations=20000, n_errors=100000)
+def draw_map_chart(n_locations, n_errors):
+    component = distance_error(n_locations, n_errors)
+    return component.draw_map_chart, None
+
+
+@benchmark("DistanceErrorAnalytics.build", n_locations=5000, n_errors=100000)
+def build_analytics(n_locations, n_errors):
+    from dash_app.custom_component.distance_analytics import DistanceErrorAnalytics
+    errors, locations = synthetic.make_error_frames(n_locations, n_errors)
+    return (lambda: DistanceErrorAnalytics(errors, locations)), None
@@ -0,0 +1,40 @@
+import json
+
+from benchmarks import synthetic
+from benchmarks.driver import CallbackDriver, create_app
+from benchmarks.registry import benchmark
+
+
+@benchmark("create_dash_application")
+def startup():
+    from flask import Flask
+    from dash_app import create_dash_application
+    return (lambda: create_dash_application(Flask(__name__))), None
+
+
+@benchmark("e2e:page-content")
+def page_content():
+    driver = CallbackDriver(*create_app())
+    callback_id = driver.find("page-content.children")
+    return (lambda: driver.call(callback_id, {"url.pathname": "/fixed-route"})), None
+
+
+@benchmark("e2e:json-upload", n_requests=1000)
+def json_upload(n_requests):
+    driver = CallbackDriver(*create_app())
+    callback_id = driver.find("session-storage.data")
+    contents = synthetic.json_upload(synthetic.make_vrp_input(n_requests=n_requests))
+    upload_id = driver.inputs(callback_id)[0]["id"]
+    return (lambda: driver.call(callback_id, {f"{upload_id}.contents": contents, f"{upload_id}.filename": "input.json"})), None
+
+
+@benchmark("e2e:download", n_requests=1000, n_trips=100)
+def download(n_requests, n_trips):
+    from benchmarks.bench_components import session_data
+    driver = CallbackDriver(*create_app())
+    callback_id = driver.find("download-text.data")
+    inputs = driver.inputs(callback_id)
+    download_id, select_id = inputs[0]["id"], inputs[1]["id"]
+    data = session_data(n_requests, n_trips)
+    values = {f"{download_id}.n_clicks": 1, f"{select_id}.value": "0", "session-storage.data": data}
+    return (lambda: driver.call(callback_id, json.loads(json.dumps(values)), [f"{download_id}.n_clicks"])), None
@@ -0,0 +1,211 @@
+import argparse
+from collections import defaultdict
+import inspect
+import json
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LARGE_INPUT_KB = 16
+
+
+def size_of(value):
+    return len(json.dumps(value).encode())
+
+
+def is_internal(entry):
+    function = entry.get("callback")
+    return function is not None and inspect.unwrap(function).__module__.split('.')[0] == 'dash'
+
+
+def callback_name(entry, dependency):
+    function = entry.get("callback")
+    if function is not None:
+        return inspect.unwrap(function).__qualname__.replace('.<locals>', '').rsplit('.', 1)[0]
+    clientside = dependency.get("clientside_function") or {}
+    return f'{clientside.get("namespace")}.{clientside.get("function_name")} (clientside)'
+
+
+def props(specs):
+    return [f'{spec["id"]}.{spec["property"]}' for spec in specs]
+
+
+def sample_state(driver, scenario):
+    from benchmarks.loadtest import build_context, replay, resolve
+    context = build_context(scenario)
+    state = replay(driver, scenario, context, 0, [], threading.Lock())
+    values = {}
+    for step in scenario["steps"]:
+        values.update(resolve(step.get("values"), context))
+    return dict(values, **state), context
+
+
+def request_bytes(driver, callback_id, values, prop):
+    return len(json.dumps(driver.payload(callback_id, values, [prop])).encode())
+
+
+def probe(driver, callback_id, prop, values):
+    status, _, data, _, _ = driver.call(callback_id, values, [prop])
+    if status == 204:
+        return "never updates an output"
+    if status != 200:
+        return None
+    status_empty, _, data_empty, _, _ = driver.call(callback_id, dict(values, **{prop: None}), [prop])
+    if status_empty == status and (data_empty or {}).get("response") == (data or {}).get("response"):
+        return "output does not depend on its value"
+    return None
+
+
+def read_only_inputs(driver, names, values, min_bytes):
+    found = []
+    for callback_id, callback in driver.dependencies.items():
+        for prop in props(callback["inputs"]):
+            if prop not in values or size_of(values[prop]) < min_bytes:
+                continue
+            reason = probe(driver, callback_id, prop, values)
+            if reason:
+                found.append(dict(callback=names[callback_id], input=prop, kb=size_of(values[prop])/1024, reason=reason))
+    return found
+
+
+def fan_out(driver, names, values, min_bytes):
+    readers = defaultdict(list)
+    for callback_id, callback in driver.dependencies.items():
+        for prop in props(callback["inputs"]):
+            readers[prop].append(callback_id)
+    found = []
+    for prop, callback_ids in readers.items():
+        if prop not in values or size_of(values[prop]) < min_bytes:
+            continue
+        found.append(dict(
+            input=prop,
+            kb=size_of(values[prop])/1024,
+            callbacks=[names[callback_id] for callback_id in callback_ids],
+            request_kb=sum(request_bytes(driver, callback_id, values, prop) for callback_id in callback_ids)/1024,
+        ))
+    return sorted(found, key=lambda item: -item["request_kb"])
+
+
+def callback_component(entry):
+    from dash_app.custom_component.instrumentation import callback_owner
+    function = entry.get("callback")
+    return callback_owner(function)[:2] if function is not None else None
+
+
+def duplicate_outputs(driver, names, components):
+    from benchmarks.driver import output_specs
+    writers = defaultdict(list)
+    for callback_id in driver.dependencies:
+        for prop in output_specs(callback_id):
+            writers[prop].append(callback_id)
+    found = []
+    for prop, callback_ids in writers.items():
+        owners = [components[callback_id] for callback_id in callback_ids if components[callback_id] is not None]
+        if len(owners) != len(set(owners)):
+            found.append(dict(output=prop, callbacks=[names[callback_id] for callback_id in callback_ids]))
+    return found
+
+
+def pattern_candidates(driver, names, internal):
+    groups = defaultdict(list)
+    for callback_id in driver.dependencies:
+        if '{' not in callback_id and callback_id not in internal:
+            groups[names[callback_id]].append(callback_id)
+    return [
+        dict(function=name, callbacks=len(callback_ids), outputs=callback_ids)
+        for name, callback_ids in groups.items() if len(callback_ids) > 1
+    ]
+
+
+def interactions(driver, names, scenario, context, values):
+    from benchmarks.driver import output_specs
+    from benchmarks.loadtest import resolve
+    readers = defaultdict(list)
+    for callback_id, callback in driver.dependencies.items():
+        for prop in props(callback["inputs"]):
+            readers[prop].append(callback_id)
+    found = []
+    for step in scenario["steps"]:
+        step_values = dict(values, **resolve(step.get("values"), context))
+        callback_id = driver.find_output(step["output"])
+        trigger = (step.get("triggered") or [driver.payload(callback_id, step_values)["changedPropIds"][0]])[0]
+        queue, fired, total = [(callback_id, trigger)], set(), 0
+        while queue:
+            callback_id, prop = queue.pop(0)
+            if callback_id in fired:
+                continue
+            fired.add(callback_id)
+            total += request_bytes(driver, callback_id, step_values, prop)
+            for output in output_specs(callback_id):
+                queue.extend((reader, output) for reader in readers[output])
+        found.append(dict(step=step["name"], callbacks=sorted(names[callback_id] for callback_id in fired), request_kb=total/1024))
+    return found
+
+
+def run(scenario, min_kb=LARGE_INPUT_KB):
+    from benchmarks.driver import CallbackDriver, create_app
+    flask_app, dash_app = create_app()
+    driver = CallbackDriver(flask_app, dash_app)
+    names = {
+        callback_id: callback_name(dash_app.callback_map.get(callback_id, {}), dependency)
+        for callback_id, dependency in driver.dependencies.items()
+    }
+    internal = {
+        callback_id for callback_id in driver.dependencies if is_internal(dash_app.callback_map.get(callback_id, {}))
+    }
+    components = {
+        callback_id: callback_component(dash_app.callback_map.get(callback_id, {})) for callback_id in driver.dependencies
+    }
+    values, context = sample_state(driver, scenario)
+    min_bytes = int(min_kb*1024)
+    return dict(
+        callbacks=len(driver.dependencies),
+        read_only_inputs=read_only_inputs(driver, names, values, min_bytes),
+        fan_out=fan_out(driver, names, values, min_bytes),
+        duplicate_outputs=duplicate_outputs(driver, names, components),
+        pattern_candidates=pattern_candidates(driver, names, internal),
+        interactions=interactions(driver, names, scenario, context, values),
+    )
+
+
+def print_report(report):
+    print(f"{report['callbacks']} callbacks registered")
+    print("\nlarge Inputs that only get read (make them State):")
+    for item in report["read_only_inputs"] or [None]:
+        print(f"  {item['callback']:35s} {item['input']:45s} {item['kb']:9.1f} KB  {item['reason']}" if item else "  none")
+    print("\nlarge Inputs and what one change uploads:")
+    for item in report["fan_out"] or [None]:
+        print(f"  {item['input']:45s} {item['kb']:9.1f} KB -> {len(item['callbacks'])} callback(s), "
+              f"{item['request_kb']:9.1f} KB: {', '.join(item['callbacks'])}" if item else "  none")
+    print("\noutputs written by more than one callback of the same component:")
+    for item in report["duplicate_outputs"] or [None]:
+        print(f"  {item['output']:45s} {', '.join(item['callbacks'])}" if item else "  none")
+    print("\nper-instance callbacks that one pattern-matching callback could replace:")
+    for item in report["pattern_candidates"] or [None]:
+        print(f"  {item['function']:45s} x{item['callbacks']}" if item else "  none")
+    print(f"\n{'interaction':20s} {'callbacks':>9s} {'request KB':>11s}")
+    for item in report["interactions"]:
+        print(f"{item['step']:20s} {len(item['callbacks']):9d} {item['request_kb']:11.1f}")
+
+
+def main(argv=None):
+    from benchmarks.loadtest import load_scenario
+    parser = argparse.ArgumentParser(description="Walk the callback graph and report redundant triggers and payload cost.")
+    parser.add_argument('--scenario', default='fixed_route', help="scenario replayed to sample component data")
+    parser.add_argument('--min-kb', type=float, default=LARGE_INPUT_KB, help="size from which an Input counts as large")
+    parser.add_argument('--strict', action='store_true', help="exit non-zero when a large Input is only read")
+    parser.add_argument('--json', metavar='PATH', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    report = run(load_scenario(args.scenario), args.min_kb)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if args.strict and report["read_only_inputs"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
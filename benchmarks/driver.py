@@ -0,0 +1,127 @@
+import json
+import time
+
+from flask import Flask
+
+
+PATCH_OPERATIONS = {
+    "Assign": lambda target, key, params: target.__setitem__(key, params["value"]),
+    "Delete": lambda target, key, params: target.__delitem__(key),
+    "Merge": lambda target, key, params: target[key].update(params["value"]),
+    "Extend": lambda target, key, params: target[key].extend(params["value"]),
+    "Append": lambda target, key, params: target[key].append(params["value"]),
+}
+
+
+def apply_patch(value, patch):
+    if not (isinstance(patch, dict) and "__dash_patch_update" in patch):
+        return patch
+    value = json.loads(json.dumps(value))
+    for operation in patch["operations"]:
+        *path, key = operation["location"]
+        target = value
+        for part in path:
+            target = target[part]
+        PATCH_OPERATIONS[operation["operation"]](target, key, operation["params"])
+    return value
+
+
+def parse_id(component_id):
+    return json.loads(component_id) if component_id.startswith('{') else component_id
+
+
+def output_specs(callback_id):
+    specs = callback_id[2:-2].split('...') if callback_id.startswith('..') else [callback_id]
+    return [spec.split('@')[0] for spec in specs]
+
+
+def create_app():
+    from dash_app import create_dash_application
+    flask_app = Flask(__name__)
+    dash_app = create_dash_application(flask_app)
+    return flask_app, dash_app
+
+
+class CallbackDriver:
+    def __init__(self, flask_app=None, dash_app=None, base_url=None, poll_interval=0.05):
+        self.dash_app = dash_app
+        self.poll_interval = poll_interval
+        self.base_url = base_url.rstrip('/') if base_url else None
+        if self.base_url:
+            import requests
+            self.session = requests.Session()
+        else:
+            self.client = flask_app.test_client()
+        self.dependencies = {callback["output"]: callback for callback in json.loads(self.get('/_dash-dependencies'))}
+
+    def get(self, path):
+        if self.base_url:
+            response = self.session.get(f'{self.base_url}{path}')
+            response.raise_for_status()
+            return response.content
+        return self.client.get(path).data
+
+    def post(self, path, body):
+        if self.base_url:
+            response = self.session.post(f'{self.base_url}{path}', data=body, headers={'Content-Type': 'application/json'})
+            return response.status_code, response.content
+        response = self.client.post(path, data=body, content_type='application/json')
+        return response.status_code, response.data
+
+    def find(self, output_prefix):
+        for callback_id in self.dependencies:
+            if callback_id.startswith(output_prefix) or callback_id.lstrip('.').startswith(output_prefix):
+                return callback_id
+        raise KeyError(output_prefix)
+
+    def find_output(self, output):
+        for callback_id in self.dependencies:
+            if output in output_specs(callback_id):
+                return callback_id
+        raise KeyError(output)
+
+    def inputs(self, callback_id):
+        return self.dependencies[callback_id]["inputs"]
+
+    def payload(self, callback_id, values=None, triggered=None):
+        values = values or {}
+        callback = self.dependencies[callback_id]
+        multi = callback_id.startswith('..')
+        outputs = [
+            dict(id=component_id, property=prop)
+            for component_id, prop in (spec.rsplit('.', 1) for spec in output_specs(callback_id))
+        ]
+
+        def items(specs):
+            return [
+                dict(id=parse_id(spec["id"]), property=spec["property"], value=values.get(f'{spec["id"]}.{spec["property"]}'))
+                for spec in specs
+            ]
+
+        inputs = items(callback["inputs"])
+        state = items(callback["state"])
+        changed = triggered if triggered is not None else [f'{i["id"]}.{i["property"]}' for i in inputs if i["value"] is not None][:1]
+        return dict(
+            output=callback_id,
+            outputs=outputs if multi else outputs[0],
+            inputs=inputs,
+            state=state,
+            changedPropIds=changed,
+        )
+
+    def call(self, callback_id, values=None, triggered=None):
+        body = json.dumps(self.payload(callback_id, values, triggered))
+        start = time.perf_counter()
+        status, content = self.post('/_dash-update-component', body)
+        data = json.loads(content) if status == 200 and content else None
+        response_bytes = len(content)
+        while data is not None and "cacheKey" in data and "response" not in data:
+            time.sleep(self.poll_interval)
+            status, content = self.post(f'/_dash-update-component?cacheKey={data["cacheKey"]}&job={data["job"]}', body)
+            response_bytes += len(content)
+            if status != 200 or not content:
+                data = None
+                break
+            data = dict(json.loads(content), cacheKey=data["cacheKey"], job=data["job"])
+        elapsed = time.perf_counter() - start
+        return status, elapsed, data, len(body), response_bytes
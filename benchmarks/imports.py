@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'dash_app.custom_component'
+SCHEMA_PATH = os.path.join(ROOT, 'dash_app', 'app_schema.json')
+
+
+def import_profile(statement):
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    profile = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        profile.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return profile
+
+
+def incremental_cost(base, target):
+    seen = {name.strip() for name, _, _ in import_profile(base)}
+    profile = import_profile(f'{base}; {target}')
+    new = [(name, cumulative) for name, _, cumulative in profile if name.strip() not in seen]
+    total = sum(self_us for name, self_us, _ in profile if name.strip() not in seen)
+    heavy = sorted(
+        ((name.strip(), cumulative) for name, cumulative in new if '.' not in name.strip() and not name.strip().startswith('_')),
+        key=lambda item: -item[1],
+    )
+    return total, heavy
+
+
+def schema_modules(schema_path):
+    sys.path.insert(0, ROOT)
+    from dash_app.custom_component import COMPONENT_MODULES, compile_schema, referenced_types
+    with open(schema_path) as f:
+        compiled = compile_schema(json.load(f))
+    types = set().union(*(referenced_types(route) for route in compiled["routes"]))
+    return sorted({COMPONENT_MODULES[name] for name in types})
+
+
+def run(schema_path=SCHEMA_PATH):
+    sys.path.insert(0, ROOT)
+    from dash_app.custom_component import COMPONENT_MODULES, discover
+    discover()
+    base = f'from {PACKAGE} import load_component_module'
+    report = dict(package=import_profile(base)[-1][2]/1e6, modules={})
+    for module in sorted(set(COMPONENT_MODULES.values())):
+        total, heavy = incremental_cost(base, f'load_component_module({module!r})')
+        components = sorted(name for name, path in COMPONENT_MODULES.items() if path == module)
+        report["modules"][module] = dict(
+            seconds=total/1e6,
+            components=components,
+            pulls=[dict(name=name, seconds=us/1e6) for name, us in heavy[:5]],
+        )
+    modules = schema_modules(schema_path)
+    total, _ = incremental_cost(base, '; '.join(f'load_component_module({module!r})' for module in modules))
+    report["schema"] = dict(modules=modules, seconds=total/1e6)
+    return report
+
+
+def print_report(report):
+    from dash_app.custom_component import module_name
+    print(f"{PACKAGE:45s} {1000*report['package']:9.1f} ms  (always imported)")
+    print(f"\n{'component module':45s} {'extra':>12s}  components / heaviest new imports")
+    for module, info in sorted(report["modules"].items(), key=lambda item: -item[1]["seconds"]):
+        pulls = ', '.join(f"{pull['name']} {1000*pull['seconds']:.0f} ms" for pull in info["pulls"])
+        print(f"{module_name(module).rsplit('.', 1)[-1]:45s} {1000*info['seconds']:9.1f} ms  {', '.join(info['components'])}")
+        if pulls:
+            print(f"{'':59s}{pulls}")
+    schema = report["schema"]
+    print(f"\napp_schema.json loads {len(schema['modules'])} module(s), {1000*schema['seconds']:.1f} ms on top of the package")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report what each component module costs to import.")
+    parser.add_argument('--schema', default=SCHEMA_PATH, help="app schema used for the startup estimate")
+    parser.add_argument('--json', metavar='PATH', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    report = run(args.schema)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios')
+
+
+@dataclass
+class Record:
+    user: int
+    step: str
+    status: int
+    seconds: float
+    request_bytes: int
+    response_bytes: int
+
+
+def load_scenario(name_or_path):
+    path = name_or_path if os.path.exists(name_or_path) else os.path.join(SCENARIO_PATH, f'{name_or_path}.json')
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_context(scenario):
+    from benchmarks import synthetic
+    generate = scenario.get("generate", {})
+    vrp_input = synthetic.make_vrp_input(
+        n_locations=generate.get("n_locations", 100),
+        n_requests=generate.get("n_requests", 500),
+    )
+    return dict(
+        json_upload=synthetic.json_upload(vrp_input),
+        csv_upload=synthetic.csv_upload(synthetic.make_manual_sheet(vrp_input, n_trips=generate.get("n_trips", 50))),
+    )
+
+
+def resolve(values, context):
+    resolved = {}
+    for key, value in (values or {}).items():
+        if isinstance(value, str) and value.startswith('$'):
+            value = context[value[1:]]
+        resolved[key] = value
+    return resolved
+
+
+def capture(state, data):
+    from benchmarks.driver import apply_patch
+    for component_id, props in (data or {}).get("response", {}).items():
+        for prop, value in props.items():
+            key = f'{component_id}.{prop}'
+            state[key] = apply_patch(state.get(key), value)
+
+
+def replay(driver, scenario, context, user, records, lock):
+    state = {}
+    for step in scenario["steps"]:
+        callback_id = driver.find_output(step["output"])
+        values = dict(state, **resolve(step.get("values"), context))
+        status, seconds, data, request_bytes, response_bytes = driver.call(callback_id, values, step.get("triggered"))
+        with lock:
+            records.append(Record(user, step["name"], status, seconds, request_bytes, response_bytes))
+        capture(state, data)
+    return state
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q*len(values)), len(values) - 1)]
+
+
+def summarize(records, wall_seconds):
+    steps = {}
+    for record in records:
+        steps.setdefault(record.step, []).append(record)
+    report = dict(
+        requests=len(records),
+        errors=sum(record.status >= 400 for record in records),
+        wall_seconds=wall_seconds,
+        throughput=len(records)/wall_seconds if wall_seconds else 0.0,
+        steps={},
+    )
+    for step, step_records in steps.items():
+        latencies = [record.seconds for record in step_records]
+        report["steps"][step] = dict(
+            requests=len(step_records),
+            errors=sum(record.status >= 400 for record in step_records),
+            mean_ms=1000*statistics.fmean(latencies),
+            p50_ms=1000*percentile(latencies, 0.5),
+            p90_ms=1000*percentile(latencies, 0.9),
+            p99_ms=1000*percentile(latencies, 0.99),
+            max_ms=1000*max(latencies),
+            request_kb=statistics.fmean(record.request_bytes for record in step_records)/1024,
+            response_kb=statistics.fmean(record.response_bytes for record in step_records)/1024,
+        )
+    latencies = [record.seconds for record in records]
+    report["p50_ms"] = 1000*percentile(latencies, 0.5)
+    report["p99_ms"] = 1000*percentile(latencies, 0.99)
+    return report
+
+
+def print_report(report):
+    print(f"{report['requests']} requests, {report['errors']} errors in {report['wall_seconds']:.2f}s "
+          f"-> {report['throughput']:.1f} req/s (p50 {report['p50_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms)")
+    print(f"\n{'step':20s} {'n':>6s} {'err':>5s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s} {'in KB':>9s} {'out KB':>9s}")
+    for step, stats in report["steps"].items():
+        print(f"{step:20s} {stats['requests']:6d} {stats['errors']:5d} {stats['p50_ms']:9.1f} {stats['p90_ms']:9.1f} "
+              f"{stats['p99_ms']:9.1f} {stats['max_ms']:9.1f} {stats['request_kb']:9.1f} {stats['response_kb']:9.1f}")
+
+
+def run_load(scenario, users=4, iterations=5, url=None, warmup=1):
+    from benchmarks.driver import CallbackDriver, create_app
+    flask_app = None if url else create_app()[0]
+    context = build_context(scenario)
+    make_driver = (lambda: CallbackDriver(base_url=url)) if url else (lambda: CallbackDriver(flask_app))
+    lock = threading.Lock()
+    for _ in range(warmup):
+        replay(make_driver(), scenario, context, -1, [], lock)
+    records = []
+
+    def user_loop(user):
+        driver = make_driver()
+        for _ in range(iterations):
+            replay(driver, scenario, context, user, records, lock)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user_loop, range(users)))
+    return summarize(records, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded callback sequences against the dashboard.")
+    parser.add_argument('--scenario', default='fixed_route', help="scenario name in benchmarks/scenarios or a path")
+    parser.add_argument('--users', type=int, default=4, help="concurrent virtual users")
+    parser.add_argument('--iterations', type=int, default=5, help="scenario replays per user")
+    parser.add_argument('--url', help="target a running server (e.g. http://127.0.0.1:7070) instead of the in-process app")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    report = run_load(load_scenario(args.scenario), args.users, args.iterations, args.url, args.warmup)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+BENCHMARKS = {}
+
+
+def benchmark(name, **params):
+    def register(func):
+        BENCHMARKS[name] = (func, params)
+        return func
+    return register
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.registry import BENCHMARKS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(ROOT, '.benchmarks')
+
+
+def git_revision():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD', '--', 'dash_app'], cwd=ROOT)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{revision}-dirty' if dirty else revision
+
+
+def measure(func, setup=None, repeat=5, min_time=0.2):
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < repeat or time.perf_counter() < deadline:
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+        if len(samples) >= 1000:
+            break
+    return dict(
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        samples=len(samples),
+    )
+
+
+def run(selected=None, repeat=5, scale=1.0):
+    results = {}
+    for name, (factory, params) in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        params = {key: int(value*scale) if isinstance(value, int) else value for key, value in params.items()}
+        func, setup = factory(**params)
+        results[name] = dict(params=params, **measure(func, setup, repeat))
+        print(f"{name:45s} {1000*results[name]['median']:10.2f} ms  (min {1000*results[name]['min']:.2f} ms, n={results[name]['samples']})")
+    return results
+
+
+def save(results, revision):
+    os.makedirs(RESULTS_PATH, exist_ok=True)
+    path = os.path.join(RESULTS_PATH, f'{revision}.json')
+    with open(path, 'w') as f:
+        json.dump(dict(
+            revision=revision,
+            created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+            python=platform.python_version(),
+            machine=platform.machine(),
+            results=results,
+        ), f, indent=2)
+    return path
+
+
+def compare(results, baseline_revision, threshold=0.1):
+    with open(os.path.join(RESULTS_PATH, f'{baseline_revision}.json')) as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'ratio':>8s}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        ratio = current["median"]/baseline[name]["median"] if baseline[name]["median"] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  SLOWER'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        print(f"{name:45s} {1000*baseline[name]['median']:10.2f}ms {1000*current['median']:10.2f}ms {ratio:8.2f}{flag}")
+    return regressions
+
+
+def load_benchmarks():
+    from benchmarks import bench_components, bench_endpoints  # noqa: F401
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the dash_app benchmark suite.")
+    parser.add_argument('-k', '--select', action='append', help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply synthetic data sizes")
+    parser.add_argument('--compare', metavar='REVISION', help="compare against stored results of a revision")
+    parser.add_argument('--threshold', type=float, default=0.1)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    load_benchmarks()
+    results = run(args.select, args.repeat, args.scale)
+    revision = git_revision()
+    if not args.no_save:
+        print(f"\nsaved {save(results, revision)}")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import base64
+import io
+import json
+import random
+
+import numpy as np
+import pandas as pd
+
+VENDORS = ("NL", "TC", "HV")
+TRUCKS = ("VC", "VD", "VE", "VG")
+TRUCK_CAPACITY = {"VC": 2.0, "VD": 3.5, "VE": 5.0, "VG": 7.0}
+
+
+def data_uri(raw: bytes, content_type: str):
+    return f"data:{content_type};base64,{base64.b64encode(raw).decode('ascii')}"
+
+
+def make_item(sku: str, quantity: int, rng: random.Random):
+    per_piece = rng.uniform(0.5, 5)
+    return dict(
+        itemCode=f"IT-{sku}-{rng.randrange(10**6)}",
+        quantity=quantity,
+        weight=per_piece*quantity,
+        cbm=per_piece*quantity/500,
+        itemCost=per_piece*quantity*10,
+        quantityPerBox=rng.choice((1, 6, 12)),
+        quantityPerPallet=rng.choice((48, 96)),
+        size=dict(length=rng.randint(10, 60), width=rng.randint(10, 60), height=rng.randint(10, 60)),
+        iType=dict(typeOfItemByStackRule=sku),
+    )
+
+
+def make_vrp_input(n_locations: int = 100, n_requests: int = 200, n_skus: int = 20,
+                   items_per_request: int = 3, vehicles_per_type: int = 2, seed: int = 0):
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    codes = [f"L{i}" for i in range(n_locations)]
+    lat = 10 + np_rng.random(n_locations)
+    lng = 106 + np_rng.random(n_locations)
+    locations = [
+        dict(locationCode=code, lat=float(lat[i]), lng=float(lng[i]), lTypes=["CUSTOMER" if i else "DEPOT"])
+        for i, code in enumerate(codes)
+    ]
+    distance = np.hypot(lat[:, None] - lat[None, :], lng[:, None] - lng[None, :])*111
+    distances = [
+        dict(srcCode=codes[i], destCode=codes[j], distance=float(distance[i, j]), travelTime=float(distance[i, j]*90))
+        for i in range(n_locations) for j in range(n_locations) if i != j
+    ]
+    depots = [dict(depotCode="D0", locationCode=codes[0])]
+    customers = [dict(customerCode=f"C{i}", locationCode=code) for i, code in enumerate(codes[1:], 1)]
+    skus = [f"SKU{i}" for i in range(n_skus)]
+    requests = []
+    for i in range(n_requests):
+        customer = rng.choice(customers)
+        requests.append(dict(
+            orderCode=f"O{i}_{rng.randrange(100)}",
+            customerCode=customer["customerCode"],
+            pickupLocationCode=codes[0],
+            deliveryLocationCode=customer["locationCode"],
+            items=[make_item(sku, rng.randint(10, 200), rng) for sku in rng.sample(skus, min(items_per_request, n_skus))],
+        ))
+    vehicles = []
+    for vendor in VENDORS:
+        for truck in TRUCKS:
+            for k in range(vehicles_per_type):
+                vehicles.append(dict(
+                    vehicleCode=f"{vendor}-{truck}-{k}",
+                    startLocationCode=codes[0],
+                    endLocationCode=codes[0],
+                    capacity=rng.choice((2000, 3500, 5000, 7000)),
+                    cbm=rng.choice((10, 20, 30)),
+                    quantity=1,
+                    vType=dict(typeOfVehicleByVendor=f"{vendor}-{truck}"),
+                ))
+    return dict(
+        locations=locations,
+        distances=distances,
+        depots=depots,
+        customers=customers,
+        requests=requests,
+        vehicles=vehicles,
+        matrixConfig=dict(distanceUnit="km"),
+        algoParams=dict(trackingId="bench"),
+        routingFee=dict(),
+    )
+
+
+def make_manual_sheet(vrp_input: dict, n_trips: int = 20, orders_per_trip: int = 5, seed: int = 0):
+    rng = random.Random(seed)
+    rows = []
+    orders = vrp_input["requests"]
+    for trip in range(n_trips):
+        vendor = rng.choice(VENDORS)
+        truck = rng.choice(TRUCKS)
+        for k, req in enumerate(rng.sample(orders, min(orders_per_trip, len(orders)))):
+            item = rng.choice(req["items"])
+            rows.append(dict(
+                vendor=vendor if k == 0 else None,
+                truckType=TRUCK_CAPACITY[truck] if k == 0 else None,
+                orderCode=req["orderCode"].split("_")[0],
+                sku=item["iType"]["typeOfItemByStackRule"],
+                quantity=rng.randint(1, 5),
+            ))
+    return pd.DataFrame.from_records(rows).to_csv(index=False)
+
+
+def json_upload(vrp_input: dict):
+    return data_uri(json.dumps(vrp_input).encode('utf-8'), "application/json")
+
+
+def csv_upload(csv_text: str):
+    return data_uri(csv_text.encode('utf-8'), "text/csv")
+
+
+def make_error_frames(n_locations: int = 1000, n_errors: int = 10000, seed: int = 0):
+    np_rng = np.random.default_rng(seed)
+    codes = np.array([f"L{i}" for i in range(n_locations)])
+    locations = pd.DataFrame(dict(
+        lat=10 + np_rng.random(n_locations),
+        lng=106 + np_rng.random(n_locations),
+        lTypes="CUSTOMER",
+    ), index=pd.Index(codes, name="locationCode"))
+    src = np_rng.integers(0, n_locations, n_errors)
+    dest = (src + np_rng.integers(1, n_locations, n_errors)) % n_locations
+    min_distance = np_rng.random(n_errors)*20
+    errors = pd.DataFrame(dict(
+        srcCode=codes[src],
+        destCode=codes[dest],
+        minDistance=min_distance,
+        actuallyDisance=min_distance*(1 + 3*np_rng.random(n_errors)),
+    )).sort_values(by=["minDistance"])
+    error_count = pd.concat([errors.srcCode, errors.destCode]).value_counts()
+    locations["errorCount"] = error_count.reindex(locations.index, fill_value=0).to_numpy()
+    return errors, locations
+
+
+def make_grid_csv(n_rows: int = 1000, seed: int = 0):
+    np_rng = np.random.default_rng(seed)
+    df = pd.DataFrame(dict(
+        item_name=[f"item {i}" for i in range(n_rows)],
+        weight=np_rng.random(n_rows)*10,
+        length=np_rng.integers(10, 100, n_rows),
+        width=np_rng.integers(10, 100, n_rows),
+        height=np_rng.integers(10, 100, n_rows),
+    ))
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
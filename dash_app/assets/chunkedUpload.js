@@ -0,0 +1,124 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    chunkedUpload: {
+        result: function (n_clicks) {
+            const propId = dash_clientside.callback_context.triggered[0].prop_id;
+            const handle = (window.chunkedUploads || {})[propId.slice(0, propId.lastIndexOf("."))];
+            return handle === undefined ? dash_clientside.no_update : handle;
+        }
+    }
+});
+
+(function () {
+    const MAX_RETRIES = 5;
+    window.chunkedUploads = window.chunkedUploads || {};
+
+    function requestsPrefix() {
+        const config = document.getElementById("_dash-config");
+        return config ? JSON.parse(config.textContent).requests_pathname_prefix : "/";
+    }
+
+    function storageKey(file) {
+        return "chunkedUpload:" + [file.name, file.size, file.lastModified].join("|");
+    }
+
+    // The server mints the id; remembering it per file lets a reload resume where the last attempt stopped.
+    async function uploadUrl(file) {
+        let uploadId = window.localStorage.getItem(storageKey(file));
+        if (!uploadId) {
+            const response = await fetch(requestsPrefix() + "_upload", {method: "POST"});
+            uploadId = (await response.json()).upload_id;
+            window.localStorage.setItem(storageKey(file), uploadId);
+        }
+        return requestsPrefix() + "_upload/" + uploadId;
+    }
+
+    function sleep(ms) {
+        return new Promise(function (resolve) { setTimeout(resolve, ms); });
+    }
+
+    function setStatus(wrapper, text) {
+        const status = wrapper.querySelector(".chunked-upload-status");
+        if (status) {
+            status.textContent = text;
+        }
+    }
+
+    async function currentOffset(url) {
+        const response = await fetch(url);
+        return response.status === 200 ? (await response.json()).offset : null;
+    }
+
+    async function upload(wrapper, file) {
+        const done = wrapper.querySelector(".chunked-upload-done");
+        const chunkSize = parseInt(wrapper.dataset.chunkSize, 10);
+        let url = await uploadUrl(file);
+        let offset = await currentOffset(url);
+        if (offset === null) {
+            window.localStorage.removeItem(storageKey(file));
+            url = await uploadUrl(file);
+            offset = 0;
+        }
+        let retries = 0;
+        while (offset < file.size) {
+            setStatus(wrapper, file.name + ": " + Math.floor(100 * offset / file.size) + "%");
+            try {
+                const response = await fetch(url + "?offset=" + offset, {
+                    method: "PUT",
+                    headers: {"Content-Type": "application/octet-stream"},
+                    body: file.slice(offset, offset + chunkSize),
+                });
+                if (response.status !== 200 && response.status !== 409) {
+                    setStatus(wrapper, file.name + ": " + (await response.json()).error);
+                    return;
+                }
+                offset = (await response.json()).offset;
+                retries = 0;
+            } catch (err) {
+                if (++retries > MAX_RETRIES) {
+                    setStatus(wrapper, file.name + ": upload failed, drop the file again to resume");
+                    return;
+                }
+                await sleep(1000 * retries);
+                offset = await currentOffset(url).then(function (current) {
+                    return current === null ? offset : current;
+                }, function () { return offset; });
+            }
+        }
+        const response = await fetch(url + "/complete", {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({filename: file.name, size: file.size}),
+        });
+        if (response.status !== 200) {
+            setStatus(wrapper, file.name + ": upload incomplete, drop the file again to resume");
+            return;
+        }
+        window.localStorage.removeItem(storageKey(file));
+        window.chunkedUploads[done.id] = await response.json();
+        setStatus(wrapper, "");
+        done.click();
+    }
+
+    // Capture at the document so dcc.Upload never base64-reads the file.
+    function intercept(event) {
+        const wrapper = event.target.closest && event.target.closest("[data-chunked-upload]");
+        if (!wrapper) {
+            return;
+        }
+        const files = event.type === "drop" ? event.dataTransfer.files : event.target.files;
+        if (!files || !files.length) {
+            return;
+        }
+        event.preventDefault();
+        event.stopPropagation();
+        upload(wrapper, files[0]).catch(function (err) {
+            setStatus(wrapper, files[0].name + ": " + err.message);
+        });
+        if (event.type === "change") {
+            event.target.value = "";
+        }
+    }
+
+    document.addEventListener("drop", intercept, true);
+    document.addEventListener("change", intercept, true);
+})();
@@ -1,10 +1,15 @@
 from .component_register import *
-from .components import *
-from .routes import *
+from .background import *
+from .chunked_upload import *
 from .base_component import *
 from .error_component import *
-from .server_monitor import *
-from .error_tracking import *
-from .fixed_route_component import *
+from .instrumentation import *
+from .schema_compiler import *
+from .shared_state import *
 
 
+def __getattr__(name):
+    module = COMPONENT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(load_component_module(module), name)
@@ -0,0 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+import hashlib
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from dash.exceptions import PreventUpdate
+from dash.long_callback.managers import BaseLongCallbackManager
+
+from .instrumentation import callback_owner
+
+STATE_PREFIX = "background:"
+PROGRESS_INTERVAL = 0.25
+
+_current_job = ContextVar("background_job", default=None)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def report_progress(*values):
+    job = _current_job.get()
+    if job is not None:
+        job.report(values)
+
+
+def mark_failed():
+    job = _current_job.get()
+    if job is not None:
+        job.failed = True
+
+
+def background_options(enabled: bool, **options):
+    if not enabled:
+        return {}
+    return dict(background=True, **options)
+
+
+@dataclass
+class BackgroundJob:
+    manager: "ThreadPoolManager"
+    job_id: str
+    result_key: str
+    progress_key: str
+    last_report: float = field(init=False, default=0.0)
+    failed: bool = field(init=False, default=False)
+
+    def cancelled(self):
+        return self.manager.store_get(f"cancel:{self.job_id}") is not None
+
+    def report(self, values):
+        now = time.monotonic()
+        if now - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        if self.cancelled():
+            raise JobCancelled(self.job_id)
+        self.manager.store_set(self.progress_key, list(values))
+
+    @contextmanager
+    def activate(self):
+        token = _current_job.set(self)
+        try:
+            yield self
+        finally:
+            _current_job.reset(token)
+
+
+@dataclass
+class ThreadPoolManager(BaseLongCallbackManager):
+    max_workers: int = 4
+    cache_by: Optional[List[Callable[[], Any]]] = None
+    expire: float = 600
+    state: Any = None
+    executor: ThreadPoolExecutor = field(init=False, repr=False)
+    entries: Dict[str, tuple] = field(init=False, repr=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dash-background")
+        super().__init__(self.cache_by)
+
+    def store_get(self, key, default=None):
+        if self.state is not None:
+            entry = self.state.get(f"{STATE_PREFIX}{key}")
+        else:
+            with self._lock:
+                entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time():
+            return default
+        return entry[1]
+
+    def store_set(self, key, value, expire=None):
+        entry = (time.time() + (expire or self.expire), value)
+        if self.state is not None:
+            self.state.set(f"{STATE_PREFIX}{key}", entry)
+            return
+        with self._lock:
+            self.entries[key] = entry
+
+    def store_delete(self, key):
+        if self.state is not None:
+            self.state.delete(f"{STATE_PREFIX}{key}")
+            return
+        with self._lock:
+            self.entries.pop(key, None)
+
+    def purge(self):
+        if self.state is not None:
+            return
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (expires, _) in self.entries.items() if expires < now]:
+                del self.entries[key]
+
+    def build_cache_key(self, fn, args, cache_args_to_ignore):
+        key = super().build_cache_key(fn, args, cache_args_to_ignore)
+        return hashlib.sha1(f"{key}{callback_owner(fn)}".encode("utf-8")).hexdigest()
+
+    def make_job_fn(self, fn, progress, key=None):
+        def job_fn(job, user_callback_args, context):
+            try:
+                if job.cancelled():
+                    return
+                try:
+                    with job.activate():
+                        if isinstance(user_callback_args, dict):
+                            output = fn(**user_callback_args)
+                        elif isinstance(user_callback_args, (list, tuple)):
+                            output = fn(*user_callback_args)
+                        else:
+                            output = fn(user_callback_args)
+                except JobCancelled:
+                    return
+                except PreventUpdate:
+                    output = {"_dash_no_update": "_dash_no_update"}
+                except Exception as err:
+                    job.failed = True
+                    output = {"long_callback_error": {"msg": str(err), "tb": traceback.format_exc()}}
+                if not job.cancelled():
+                    self.store_set(job.result_key, (output, not job.failed))
+            finally:
+                self.store_delete(f"job:{job.job_id}")
+                self.store_delete(f"cancel:{job.job_id}")
+        return job_fn
+
+    def call_job_fn(self, key, job_fn, args, context):
+        self.purge()
+        job_id = uuid.uuid4().hex
+        if self.cache_by is not None and self.result_ready(key):
+            return job_id
+        job = BackgroundJob(self, job_id, key, self._make_progress_key(key))
+        self.store_set(f"job:{job_id}", key)
+        self.executor.submit(copy_context().run, job_fn, job, args, context)
+        return job_id
+
+    def terminate_job(self, job):
+        if job and self.job_running(job):
+            self.store_set(f"cancel:{job}", True)
+
+    def terminate_unhealthy_job(self, job):
+        return False
+
+    def job_running(self, job):
+        return bool(job) and self.store_get(f"job:{job}") is not None
+
+    def clear_cache_entry(self, key):
+        self.store_delete(key)
+
+    def get_progress(self, key):
+        progress_key = self._make_progress_key(key)
+        progress = self.store_get(progress_key)
+        if progress is not None:
+            self.store_delete(progress_key)
+        return progress
+
+    def result_ready(self, key):
+        return self.store_get(key, self.UNDEFINED) is not self.UNDEFINED
+
+    def get_result(self, key, job):
+        result = self.store_get(key, self.UNDEFINED)
+        if result is self.UNDEFINED:
+            return self.UNDEFINED
+        output, cacheable = result
+        if self.cache_by is None or not cacheable:
+            self.clear_cache_entry(key)
+        else:
+            self.store_set(key, result)
+        self.clear_cache_entry(self._make_progress_key(key))
+        return output
@@ -1,13 +1,14 @@
-from typing import Optional, Union, List
-import uuid
+from typing import ClassVar, Dict, Optional, Union, List
 from typing_extensions import Self
 
 from dataclasses import dataclass, field
-from dash import Dash, html
+from dash import Dash, MATCH, html, Input, Output
 import dash_bootstrap_components as dbc
 from dash.development.base_component import Component
 from abc import ABC, abstractproperty, abstractmethod
+from .background import background_options
 from .component_register import COMPONENT_CLASS, component_register
+from .pattern_matching import matched_index, pattern_instances, register_once
 
 @dataclass
 class MetaComponent(ABC):
@@ -25,15 +26,26 @@ class MetaComponent(ABC):
         pass
     
 @dataclass
+@component_register
 class BaseComponent(MetaComponent):
     name: str = ''
     _index: str = ''
     children: Optional[Union[Self, List[Self]]] = None
     layout: Component = field(init=False)
+    process_safe: ClassVar[bool] = True
+    thread_safe: ClassVar[bool] = True
     
     def __post_init__(self):
         self.layout = self.make_layout()
     
+    def walk(self):
+        yield self
+        if self.children is None or isinstance(self.children, str):
+            return
+        children = self.children if isinstance(self.children, List) else [self.children]
+        for child in children:
+            yield from child.walk()
+    
     @property
     def index(self):
         return self._index
@@ -45,26 +57,45 @@ class BaseComponent(MetaComponent):
     def make_layout(self) -> Component:
         return html.Div(f"Component {self.__class__.__name__}:\nname = {self.name}, index = {self.index}", id=self.index)
     
+    def pattern_id(self, role: str):
+        return {"type": f"{type(self).__name__}-{role}", "index": self._index}
+    
+    @classmethod
+    def match_id(cls, role: str):
+        return {"type": f"{cls.__name__}-{role}", "index": MATCH}
+    
+    @classmethod
+    def pattern_instances(cls, dash_app: Dash) -> Dict[str, Self]:
+        return pattern_instances(dash_app, cls)
+    
+    @classmethod
+    def matched_instance(cls, dash_app: Dash) -> Self:
+        return cls.pattern_instances(dash_app)[matched_index()]
+    
+    @classmethod
+    def dispatch(cls, dash_app: Dash, factory: str):
+        def func(*args):
+            return getattr(cls.matched_instance(dash_app), factory)()(*args)
+        func.__callback_owner__ = (cls.__name__, "", factory)
+        return func
+    
+    @classmethod
+    def register_pattern_callbacks(cls, dash_app: Dash):
+        pass
+    
+    def register_pattern_instance(self, dash_app: Dash):
+        type(self).pattern_instances(dash_app)[self._index] = self
+        register_once(dash_app, type(self), type(self).register_pattern_callbacks)
+    
     @classmethod
     def from_config(cls, config):
-        cls_type = config.pop("type", None)
-        if cls_type is not None:
-            cls = COMPONENT_CLASS.get(cls_type, BaseComponent)
-        children_config = config.pop("children", "")
-        if isinstance(children_config, str):
-            children = BaseComponent('', str(uuid.uuid4()))
-        elif isinstance(children_config, List):
-            children = []
-            for child_config in children_config:
-                child_type = child_config.pop("type")
-                child_cls = COMPONENT_CLASS.get(child_type, BaseComponent)
-                child_config["_index"] = f'{config["_index"]}-{child_config["_index"]}'
-                children.append(child_cls.from_config(child_config))
-        else:
-            children_type = children_config.pop("type")
-            children_cls = COMPONENT_CLASS.get(children_type, BaseComponent)
-            children = children_cls.from_config(children_config)
-        return cls(children=children, **config)
+        from .schema_compiler import compile_component
+        return cls.from_compiled(compile_component(config, default_type=cls.__name__))
+    
+    @classmethod
+    def from_compiled(cls, node):
+        from .schema_compiler import build_component
+        return build_component(node)
 
     def register_callback(self, dash_app: Dash):
         if self.children is None or isinstance(self.children, str):
@@ -77,6 +108,7 @@ class BaseComponent(MetaComponent):
             
 
 @dataclass
+@component_register
 class Route(BaseComponent):
     href: str = ''
 
@@ -103,6 +135,7 @@ class FullyStructuredComponent(BaseComponent):
     nav_id: str = ''
     body_id: str = ''
     footer_id: str = ''
+    background: bool = False
     
     def __post_init__(self):
         self.index = self._index
@@ -135,6 +168,35 @@ class FullyStructuredComponent(BaseComponent):
     @property
     def footer(self):
         return html.Div(f"This is footer of {self.name} {self.__class__.__name__}", id=self.footer_id)
+    
+    @property
+    def progress_id(self):
+        return f"{self.index}-progress"
+    
+    @property
+    def cancel_id(self):
+        return f"{self.index}-cancel"
+    
+    @property
+    def progress_bar(self):
+        if not self.background:
+            return html.Div()
+        return html.Div([
+            dbc.Progress(id=self.progress_id, value=0, striped=True, animated=True, style={"flex": 1}),
+            dbc.Button("Cancel", id=self.cancel_id, color="secondary", size="sm", disabled=True, style={"margin-left": "8px"}),
+        ], id=f"{self.progress_id}-wrapper", style={"display": "none"})
+    
+    def background_options(self, **options):
+        return background_options(
+            self.background,
+            progress=[Output(self.progress_id, "value"), Output(self.progress_id, "label")],
+            cancel=[Input(self.cancel_id, "n_clicks")],
+            running=[
+                (Output(self.cancel_id, "disabled"), False, True),
+                (Output(f"{self.progress_id}-wrapper", "style"), {"display": "flex", "margin": "8px"}, {"display": "none"}),
+            ],
+            **options,
+        )
 
     def make_layout(self):
         return html.Div([
@@ -0,0 +1,261 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field, is_dataclass
+from functools import wraps
+import hashlib
+from itertools import islice
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+_MISSING = object()
+MEMO_MAX_BYTES = 32 * 1024 * 1024
+SIZE_SAMPLE = 1000
+
+
+def plain_size(value: Any) -> int:
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(plain_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(plain_size(item) for item in value)
+    nbytes = getattr(value, "nbytes", None)
+    return nbytes if isinstance(nbytes, int) else sys.getsizeof(value)
+
+
+def frame_size(frame: pd.DataFrame) -> int:
+    total = int(frame.memory_usage(index=True).sum())
+    for column in (frame.index, *(column for _, column in frame.items())):
+        if column.dtype == object and len(column):
+            sample = column[::max(1, len(column)//SIZE_SAMPLE)]
+            total += sum(map(sys.getsizeof, sample))*len(column)//len(sample)
+    return total
+
+
+def sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, tuple):
+        return sum(sizeof(item) for item in value)
+    if isinstance(value, pd.DataFrame):
+        return frame_size(value)
+    if isinstance(value, dict) and len(value) > SIZE_SAMPLE:
+        sample = dict(islice(value.items(), SIZE_SAMPLE))
+        return sizeof(sample)*len(value)//SIZE_SAMPLE
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        usage = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, BaseFigure):
+        return plain_size(value.to_dict())
+    if is_dataclass(value) and not isinstance(value, type):
+        return sum(sizeof(item) for item in vars(value).values())
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+@dataclass
+class ResponseCache:
+    max_bytes: int = 64 * 1024 * 1024
+    ttl: float = 600
+    disk_path: str = ''
+    disk_max_bytes: int = 512 * 1024 * 1024
+    hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    size: int = field(init=False, default=0)
+    _entries: OrderedDict = field(init=False, repr=False, default_factory=OrderedDict)
+    _lock: threading.RLock = field(init=False, repr=False, default_factory=threading.RLock)
+
+    def __post_init__(self):
+        if self.disk_path:
+            os.makedirs(self.disk_path, exist_ok=True)
+
+    def __contains__(self, key: Hashable):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits/total if total else 0.0
+
+    @property
+    def stats(self):
+        return dict(
+            entries=len(self._entries),
+            bytes=self.size,
+            max_bytes=self.max_bytes,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hit_rate,
+        )
+
+    def get(self, key: Hashable, default: Any = None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, _, value = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop(key)
+        value = self._disk_get(key)
+        if value is _MISSING:
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        self._memory_put(key, value, self.ttl)
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._memory_put(key, value, ttl)
+        self._disk_put(key, value, ttl)
+        return value
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], ttl: float = None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            if value is not None:
+                self.put(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._drop(key)
+        if self.disk_path:
+            try:
+                os.remove(self._disk_file(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+        if self.disk_path:
+            for name in os.listdir(self.disk_path):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_path, name))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def _memory_put(self, key, value, ttl):
+        nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, nbytes, value)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                old_key = next(iter(self._entries))
+                self._drop(old_key)
+
+    def _disk_file(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_path, f'{digest}.pkl')
+
+    def _disk_get(self, key):
+        if not self.disk_path:
+            return _MISSING
+        path = self._disk_file(key)
+        try:
+            with open(path, 'rb') as f:
+                expires, value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        if expires < time.time():
+            self.invalidate(key)
+            return _MISSING
+        os.utime(path)
+        return value
+
+    def _disk_put(self, key, value, ttl):
+        if not self.disk_path:
+            return
+        path = self._disk_file(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((time.time() + ttl, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+        self._disk_evict()
+
+    def _disk_evict(self):
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_path):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        files.sort()
+        for _, nbytes, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= nbytes
+
+
+def digestible(value: Any):
+    if hasattr(value, "_index"):
+        return (value.__class__.__name__, value._index)
+    if isinstance(value, (list, tuple)):
+        return tuple(digestible(item) for item in value)
+    return value
+
+
+def digest(value: Any) -> str:
+    value = digestible(value)
+    try:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        raw = repr(value).encode('utf-8')
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+MEMO_CACHES: Dict[str, ResponseCache] = {}
+
+
+def memoize(key: Callable = None, max_bytes: int = MEMO_MAX_BYTES, ttl: float = 600):
+    def decorator(func):
+        cache = MEMO_CACHES[func.__qualname__] = ResponseCache(max_bytes=max_bytes, ttl=ttl)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            memo_key = digest(key(*args, **kwargs) if key else (args, sorted(kwargs.items())))
+            value = cache.get(memo_key, _MISSING)
+            if value is _MISSING:
+                value = cache.put(memo_key, func(*args, **kwargs))
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,250 @@
+import base64
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from glob import glob
+import hashlib
+import hmac
+import io
+import json
+import mimetypes
+import os
+import re
+import secrets
+import threading
+import time
+
+from dash import ClientsideFunction, Dash, Input, Output, ctx, dcc, html
+from flask import jsonify, request
+
+from .cache import ResponseCache
+from .pattern_matching import matching, register_once
+
+UPLOAD_SPOOL_PATH = os.getcwd() + '/dash_app/.cache/uploads/'
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 8 * UPLOAD_CHUNK_SIZE
+UPLOAD_MAX_BYTES = 1024 * 1024 * 1024
+UPLOAD_TTL = 24*3600
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9A-Za-z_-]{8,64}$')
+UPLOAD_CACHE_PATH = os.getcwd() + '/dash_app/.cache/parsed_uploads/'
+UPLOAD_CACHE_TTL = 7*24*3600
+UPLOAD_OWNER_COOKIE = "dash_upload_owner"
+
+_upload_owner = ContextVar("upload_owner", default=None)
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UploadForbidden(PermissionError):
+    pass
+
+
+@dataclass
+class UploadSpool:
+    path: str = UPLOAD_SPOOL_PATH
+    max_bytes: int = UPLOAD_MAX_BYTES
+    ttl: float = UPLOAD_TTL
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def file(self, upload_id: str, suffix: str = ''):
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise ValueError(f"Invalid upload id {upload_id!r}")
+        return os.path.join(self.path, f"{upload_id}{suffix}")
+
+    @staticmethod
+    def owner_digest(owner: str):
+        return hashlib.sha256(owner.encode('utf-8')).hexdigest()
+
+    def create(self, owner: str):
+        os.makedirs(self.path, exist_ok=True)
+        upload_id = secrets.token_hex(16)
+        with open(self.file(upload_id, '.owner'), 'w') as f:
+            f.write(self.owner_digest(owner))
+        return upload_id
+
+    def check_owner(self, upload_id: str):
+        owner = upload_owner()
+        try:
+            with open(self.file(upload_id, '.owner')) as f:
+                expected = f.read()
+        except FileNotFoundError:
+            raise UploadForbidden(f"Unknown upload {upload_id}")
+        if owner is None or not hmac.compare_digest(expected, self.owner_digest(owner)):
+            raise UploadForbidden(f"Upload {upload_id} belongs to another session")
+
+    def offset(self, upload_id: str):
+        for suffix in ('.part', ''):
+            try:
+                return os.path.getsize(self.file(upload_id, suffix))
+            except FileNotFoundError:
+                pass
+        return 0
+
+    def append(self, upload_id: str, offset: int, stream):
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, open(self.file(upload_id, '.part'), 'ab') as f:
+            current = f.seek(0, os.SEEK_END)
+            if current != offset:
+                return current, False
+            while True:
+                chunk = stream.read(64 * 1024)
+                if not chunk:
+                    break
+                if f.tell() + len(chunk) > self.max_bytes:
+                    f.truncate(offset)
+                    raise UploadTooLarge(f"Uploads are limited to {self.max_bytes} bytes")
+                f.write(chunk)
+            return f.tell(), True
+
+    def complete(self, upload_id: str, filename: str, size: int):
+        part, final = self.file(upload_id, '.part'), self.file(upload_id)
+        with self._lock:
+            if os.path.exists(part) and os.path.getsize(part) == size:
+                os.replace(part, final)
+            elif size == 0 and not os.path.exists(final):
+                os.makedirs(self.path, exist_ok=True)
+                open(final, 'wb').close()
+            if not os.path.exists(final) or os.path.getsize(final) != size:
+                return None
+            os.utime(final)
+            os.utime(self.file(upload_id, '.owner'))
+        self.purge()
+        return dict(upload_id=upload_id, filename=os.path.basename(filename), size=size)
+
+    def spooled(self, handle: dict):
+        self.check_owner(handle["upload_id"])
+        return self.file(handle["upload_id"])
+
+    def open(self, handle: dict):
+        return open(self.spooled(handle), 'rb')
+
+    def purge(self):
+        expired = time.time() - self.ttl
+        for path in glob(os.path.join(self.path, '*')):
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def bind_owner(self):
+        _upload_owner.set(request.cookies.get(UPLOAD_OWNER_COOKIE))
+
+    def create_view(self):
+        owner = upload_owner() or secrets.token_urlsafe(24)
+        response = jsonify(upload_id=self.create(owner))
+        if owner != request.cookies.get(UPLOAD_OWNER_COOKIE):
+            response.set_cookie(UPLOAD_OWNER_COOKIE, owner, max_age=int(self.ttl), httponly=True, samesite="Lax")
+        return response
+
+    def chunk_view(self, upload_id):
+        try:
+            self.check_owner(upload_id)
+            if request.method == 'GET':
+                return jsonify(offset=self.offset(upload_id))
+            if (request.content_length or 0) > UPLOAD_MAX_CHUNK_SIZE:
+                return jsonify(error=f"Chunks are limited to {UPLOAD_MAX_CHUNK_SIZE} bytes"), 413
+            offset, accepted = self.append(upload_id, int(request.args["offset"]), request.stream)
+        except UploadTooLarge as e:
+            return jsonify(error=str(e)), 413
+        except UploadForbidden as e:
+            return jsonify(error=str(e)), 403
+        except (KeyError, ValueError) as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(offset=offset), 200 if accepted else 409
+
+    def complete_view(self, upload_id):
+        body = request.get_json(force=True, silent=True) or {}
+        try:
+            self.check_owner(upload_id)
+            handle = self.complete(upload_id, str(body.get("filename", upload_id)), int(body.get("size", -1)))
+        except UploadForbidden as e:
+            return jsonify(error=str(e)), 403
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        if handle is None:
+            return jsonify(offset=self.offset(upload_id)), 409
+        return jsonify(handle)
+
+    def register(self, server, url_base: str = '/'):
+        server.before_request(self.bind_owner)
+        server.add_url_rule(f"{url_base}_upload", "chunked_upload_create", self.create_view, methods=['POST'])
+        server.add_url_rule(f"{url_base}_upload/<upload_id>", "chunked_upload", self.chunk_view, methods=['GET', 'PUT'])
+        server.add_url_rule(
+            f"{url_base}_upload/<upload_id>/complete", "chunked_upload_complete", self.complete_view, methods=['POST'],
+        )
+
+
+UPLOAD_SPOOL = UploadSpool()
+UPLOAD_CACHE = ResponseCache(
+    max_bytes=256 * 1024 * 1024,
+    ttl=UPLOAD_CACHE_TTL,
+    disk_path=UPLOAD_CACHE_PATH,
+    disk_max_bytes=2 * 1024 * 1024 * 1024,
+)
+
+
+def upload_owner():
+    return _upload_owner.get()
+
+
+def file_digest(path: str):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def upload_digest(contents):
+    if isinstance(contents, dict):
+        return file_digest(UPLOAD_SPOOL.spooled(contents))
+    return hashlib.sha1(base64.b64decode(contents.split(',')[1])).hexdigest()
+
+
+def chunked_id(upload_id, role: str):
+    if isinstance(upload_id, dict):
+        return dict(upload_id, type=f"{upload_id['type']}-{role}")
+    return {"type": f"chunked-upload-{role}", "index": upload_id}
+
+
+def upload_file_id(upload_id):
+    return chunked_id(upload_id, "file")
+
+
+def chunked_upload(upload_id, **upload_props):
+    key = json.dumps(upload_id, sort_keys=True, separators=(',', ':')) if isinstance(upload_id, dict) else upload_id
+    return html.Div([
+        dcc.Upload(id=upload_id, **upload_props),
+        html.Div(className="chunked-upload-status"),
+        html.Button(id=chunked_id(upload_id, "done"), className="chunked-upload-done", style={"display": "none"}),
+        dcc.Store(id=upload_file_id(upload_id)),
+    ], **{"data-chunked-upload": key, "data-chunk-size": UPLOAD_CHUNK_SIZE})
+
+
+def register_chunked_upload(dash_app: Dash, upload_id):
+    done, file = chunked_id(upload_id, "done"), upload_file_id(upload_id)
+    register_once(dash_app, ("chunked-upload", done["type"]), lambda app: app.clientside_callback(
+        ClientsideFunction(namespace="chunkedUpload", function_name="result"),
+        Output(matching(file), "data"),
+        Input(matching(done), "n_clicks"),
+        prevent_initial_call=True,
+    ))
+
+
+def upload_source(upload_id: str, contents, upload, filename):
+    if isinstance(upload, dict) and ctx.triggered_id != upload_id:
+        return upload, upload["filename"]
+    return contents, filename
+
+
+@contextmanager
+def open_upload(contents, filename=None):
+    if isinstance(contents, dict):
+        with UPLOAD_SPOOL.open(contents) as f:
+            yield mimetypes.guess_type(contents.get("filename") or filename or '')[0] or '', f
+        return
+    content_type, content_string = contents.split(',')
+    yield content_type, io.BytesIO(base64.b64decode(content_string))
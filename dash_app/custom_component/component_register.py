@@ -1,5 +1,184 @@
-COMPONENT_CLASS = {}
+import ast
+from glob import glob
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+
+ENTRY_POINT_GROUP = "dash_app.components"
+PLUGIN_PATHS = [
+    path for path in os.environ.get('DASH_COMPONENT_PLUGINS', os.getcwd() + '/dash_app/plugins').split(os.pathsep) if path
+]
+MANIFEST_PATH = os.getcwd() + '/dash_app/.cache/components.json'
+BUILTIN_COMPONENTS = {
+    "base_component": ("BaseComponent", "Route", "FullyStructuredComponent"),
+    "components": ("GridCRUD", "TabsCollapse", "FullyStructuredCard"),
+    "error_tracking": ("DistanceMatrixError",),
+    "fixed_route_component": ("JsonUploader", "XlsxUploader", "Downloader"),
+    "routes": ("NavigationRoute", "SharedDataStep", "StepperNavigationRoute"),
+    "server_monitor": ("LiveUpdateFigure", "CallbackMonitor"),
+}
+COMPONENT_MODULES = {
+    name: f"{__package__}.{module}" for module, names in BUILTIN_COMPONENTS.items() for name in names
+}
+IMPORT_TIMES = {}
+
+_discovered = False
+_discover_lock = threading.Lock()
+
+
+def split_spec(spec):
+    if spec.endswith('.py'):
+        return spec, None
+    module, _, attr = spec.partition(':')
+    return module, attr or None
+
+
+def module_name(spec):
+    module, _ = split_spec(spec)
+    if module.endswith('.py'):
+        return f"dash_app_plugin_{os.path.splitext(os.path.basename(module))[0]}"
+    return module
+
+
+def module_origin(spec):
+    module, _ = split_spec(spec)
+    if module.endswith('.py'):
+        return module
+    return importlib.util.find_spec(module).origin
+
+
+def load_component_module(spec):
+    name = module_name(spec)
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module, _ = split_spec(spec)
+    if module.endswith('.py'):
+        file_spec = importlib.util.spec_from_file_location(name, module)
+        loaded = importlib.util.module_from_spec(file_spec)
+        sys.modules[name] = loaded
+        try:
+            file_spec.loader.exec_module(loaded)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    else:
+        loaded = importlib.import_module(module)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return loaded
+
+
+def scan_entry_points(group=ENTRY_POINT_GROUP):
+    return {entry_point.name: entry_point.value for entry_point in importlib.metadata.entry_points(group=group)}
+
+
+def is_register_decorator(node):
+    if isinstance(node, ast.Call):
+        node = node.func
+    return (isinstance(node, ast.Name) and node.id == "component_register") or \
+        (isinstance(node, ast.Attribute) and node.attr == "component_register")
+
+
+def scan_plugin_paths(plugin_paths=PLUGIN_PATHS):
+    found = {}
+    for path in plugin_paths:
+        for file in sorted(glob(os.path.join(path, '*.py'))):
+            if os.path.basename(file).startswith('_'):
+                continue
+            with open(file, 'rb') as f:
+                tree = ast.parse(f.read(), filename=file)
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef) and any(is_register_decorator(d) for d in node.decorator_list):
+                    found[node.name] = os.path.abspath(file)
+    return found
+
+
+def discovery_fingerprint(plugin_paths=PLUGIN_PATHS):
+    stamps = [ENTRY_POINT_GROUP]
+    for entry in sys.path:
+        if entry and os.path.isdir(entry):
+            stamps.append((entry, os.stat(entry).st_mtime_ns))
+    for path in plugin_paths:
+        for file in sorted(glob(os.path.join(path, '*.py'))):
+            stat = os.stat(file)
+            stamps.append((file, stat.st_mtime_ns, stat.st_size))
+    return hashlib.sha256(json.dumps(stamps).encode('utf-8')).hexdigest()
+
+
+def read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def discover(plugin_paths=PLUGIN_PATHS, manifest_path=MANIFEST_PATH, force=False):
+    global _discovered
+    with _discover_lock:
+        if _discovered and not force:
+            return False
+        _discovered = True
+        fingerprint = discovery_fingerprint(plugin_paths)
+        manifest = read_manifest(manifest_path) if manifest_path and not force else {}
+        if manifest.get("fingerprint") == fingerprint:
+            found = manifest["components"]
+        else:
+            found = dict(scan_entry_points(), **scan_plugin_paths(plugin_paths))
+            if manifest_path:
+                write_manifest(manifest_path, dict(fingerprint=fingerprint, components=found))
+        added = False
+        for name, spec in found.items():
+            if name not in COMPONENT_MODULES:
+                COMPONENT_MODULES[name] = spec
+                added = True
+        return added
+
+
+class ComponentRegistry(dict):
+    def __missing__(self, name):
+        if name not in COMPONENT_MODULES:
+            discover()
+        spec = COMPONENT_MODULES.get(name)
+        if spec is None:
+            raise KeyError(name)
+        loaded = load_component_module(spec)
+        if not dict.__contains__(self, name):
+            cls = getattr(loaded, split_spec(spec)[1] or name, None)
+            if cls is None:
+                raise KeyError(name)
+            dict.__setitem__(self, name, cls)
+        return dict.__getitem__(self, name)
+
+    def __contains__(self, name):
+        if dict.__contains__(self, name) or name in COMPONENT_MODULES:
+            return True
+        discover()
+        return name in COMPONENT_MODULES
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+COMPONENT_CLASS = ComponentRegistry()
 
 def component_register(cls):
     COMPONENT_CLASS[cls.__name__] = cls
-    return cls
\ No newline at end of file
+    return cls
@@ -1,7 +1,5 @@
 
-import base64
 from dataclasses import dataclass, field
-import io
 import json
 from numbers import Number
 import os
@@ -9,10 +7,11 @@ from typing import List
 
 from ..style import *
 from .base_component import BaseComponent, CollapsibleComponent, FullyStructuredComponent
+from .chunked_upload import chunked_upload, open_upload, register_chunked_upload, upload_file_id, upload_source
 from .component_register import component_register
 import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
-from dash import Dash, html, Input, Output, State, dcc, no_update, ctx
+from dash import ALL, Dash, html, Input, Output, State, dcc, no_update, ctx
 import pandas as pd
 
 DATA_PATH = os.getcwd() +'/dash_app/master_data/'
@@ -27,6 +26,10 @@ class GridCRUD(CollapsibleComponent):
     def index(self):
         return f"{self._index}-grid"
     
+    @property
+    def grid_id(self):
+        return self.pattern_id("grid")
+    
     @staticmethod
     def extract_col_def(raw_def):
         col_def = {}
@@ -71,7 +74,7 @@ class GridCRUD(CollapsibleComponent):
         
     def build_grid(self):
         grid = dag.AgGrid(
-            id=self.index,
+            id=self.grid_id,
             rowData=self.get_data(),
             columnDefs=self.get_grid_define(),
             columnSize="autoSize",
@@ -88,46 +91,46 @@ class GridCRUD(CollapsibleComponent):
     
     @property
     def add_btn_id(self):
-        return f"add-{self._index}"
+        return self.pattern_id("add")
     
     def add_btn(self):
         return dbc.Button(f"Add {self.name}", id=self.add_btn_id, color="success", className="me-1")
     
     @property
     def delete_btn_id(self):
-        return f"delete-{self._index}"
+        return self.pattern_id("delete")
     
     def delete_btn(self):
         return dbc.Button(f"Delete {self.name}", id=self.delete_btn_id, color="danger", className="me-1")
     
     @property
     def import_btn_id(self):
-        return f"import-{self._index}"
+        return self.pattern_id("import")
     
     def import_btn(self):
         return dbc.Button(f"import {self.name}", id=self.import_btn_id, color="warning", className="me-1")
     
     @property
     def grid_output_id(self):
-        return f"{self._index}-grid-output"
+        return self.pattern_id("grid-output")
     
     @property
     def upload_modal_id(self):
-        return f"upload-modal-{self._index}"
+        return self.pattern_id("upload-modal")
     
     @property
     def upload_csv_id(self):
-        return f"upload-csv-{self._index}"
+        return self.pattern_id("upload-csv")
     
     @property
     def upload_output_id(self):
-        return f"upload-output-{self._index}"
+        return self.pattern_id("upload-output")
     
     def upload_modal(self):
         return dbc.Modal(id=self.upload_modal_id,
                         children=[
-                            dcc.Upload(
-                                id=self.upload_csv_id,
+                            chunked_upload(
+                                self.upload_csv_id,
                                 children=html.Div([
                                     'Drag and Drop or ',
                                     html.A('Select a .csv File')
@@ -153,7 +156,7 @@ class GridCRUD(CollapsibleComponent):
     
     @property
     def save_btn_id(self):
-        return f"save-{self._index}"
+        return self.pattern_id("save")
     
     def save_btn(self):
         return dbc.Button("Save", id=self.save_btn_id, class_name="mr-auto")
@@ -188,52 +191,56 @@ class GridCRUD(CollapsibleComponent):
         return func
     
     def import_data(self):
-        def func(n, content, fn):
+        def func(n, content, upload, fn):
             if ctx.triggered_id == self.import_btn_id:
                 return True, no_update, no_update
+            content, fn = upload_source(self.upload_csv_id, content, upload, fn)
             if content:
                 ext = fn.split('.')[-1]
                 if ext != 'csv':
                     return True, no_update, "Chi nhan file .csv"
                 else:
-                    _, content_string = content.split(',')
-
-                    decoded = base64.b64decode(content_string)
-                    df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
+                    with open_upload(content, fn) as (_, f):
+                        df = pd.read_csv(f, encoding='utf-8')
                     rowData=df.to_dict("records")
                     return False, rowData, no_update
             return no_update, no_update, no_update
         return func
     
-    def register_callback(self, dash_app: Dash):
-        super().register_callback(dash_app)
-        
+    @classmethod
+    def register_pattern_callbacks(cls, dash_app: Dash):
         dash_app.callback(
-            Output(self.index, "deleteSelectedRows"),
-            Output(self.index, "rowData"),
-            Output(self.grid_output_id, "children"),
-            Input(self.add_btn_id, "n_clicks"),
-            Input(self.delete_btn_id, "n_clicks"),
-            State(self.index, "rowData"),
+            Output(cls.match_id("grid"), "deleteSelectedRows"),
+            Output(cls.match_id("grid"), "rowData"),
+            Output(cls.match_id("grid-output"), "children"),
+            Input(cls.match_id("add"), "n_clicks"),
+            Input(cls.match_id("delete"), "n_clicks"),
+            State(cls.match_id("grid"), "rowData"),
             prevent_initial_call=True,
-        )(self.update_grid())
+        )(cls.dispatch(dash_app, "update_grid"))
         
         dash_app.callback(
-            Output(self.grid_output_id, "children", allow_duplicate=True),
-            Input(self.save_btn_id, "n_clicks"),
-            State(self.index, "rowData"),
+            Output(cls.match_id("grid-output"), "children", allow_duplicate=True),
+            Input(cls.match_id("save"), "n_clicks"),
+            State(cls.match_id("grid"), "rowData"),
             prevent_initial_call=True,
-        )(self.save_data())
+        )(cls.dispatch(dash_app, "save_data"))
         
         dash_app.callback(
-            Output(self.upload_modal_id, "is_open", allow_duplicate=True),
-            Output(self.index, "rowData", allow_duplicate=True),
-            Output(self.upload_output_id, 'children', allow_duplicate=True),
-            Input(self.import_btn_id, "n_clicks"),
-            Input(self.upload_csv_id, "contents"),
-            State(self.upload_csv_id, "filename"),
+            Output(cls.match_id("upload-modal"), "is_open", allow_duplicate=True),
+            Output(cls.match_id("grid"), "rowData", allow_duplicate=True),
+            Output(cls.match_id("upload-output"), 'children', allow_duplicate=True),
+            Input(cls.match_id("import"), "n_clicks"),
+            Input(cls.match_id("upload-csv"), "contents"),
+            Input(upload_file_id(cls.match_id("upload-csv")), "data"),
+            State(cls.match_id("upload-csv"), "filename"),
         prevent_initial_call=True,
-        )(self.import_data())
+        )(cls.dispatch(dash_app, "import_data"))
+    
+    def register_callback(self, dash_app: Dash):
+        super().register_callback(dash_app)
+        self.register_pattern_instance(dash_app)
+        register_chunked_upload(dash_app, self.upload_csv_id)
         
     
 @dataclass
@@ -244,15 +251,24 @@ class TabsCollapse(FullyStructuredComponent):
     @property
     def index(self):
         return f"{self._index}-tabs-collapse"
+    
+    @index.setter
+    def index(self, _value):
+        FullyStructuredComponent.index.fset(self, _value)
+    
+    @property
+    def tabs_id(self):
+        return self.pattern_id("tabs")
 
     @property
     def header(self):
         tabs = []
         for child in self.children:
             child.tab_id = f"{child._index}-tab"
+            child.collapse_id = dict(self.pattern_id("pane"), tab=child.tab_id)
             tabs.append(dbc.Tab(label=child.name.upper(), tab_id=child.tab_id))
         dbc_tabs = dbc.Tabs(tabs, 
-                 id=self.index,
+                 id=self.tabs_id,
                  active_tab=self.children[0].tab_id
             )
         return dbc_tabs
@@ -270,19 +286,20 @@ class TabsCollapse(FullyStructuredComponent):
     def footer(self):
         return 
 
-    def sync_open_tab_collapse(self, child: CollapsibleComponent):
-        def func(active_tab):
-            return child.tab_id == active_tab
-        return func
+    @staticmethod
+    def sync_open_tab_collapse(active_tab):
+        return [pane["id"]["tab"] == active_tab for pane in ctx.outputs_list]
+    
+    @classmethod
+    def register_pattern_callbacks(cls, dash_app: Dash):
+        dash_app.callback(
+                Output(dict(cls.match_id("pane"), tab=ALL), "is_open"),
+                Input(cls.match_id("tabs"), "active_tab")
+            )(cls.sync_open_tab_collapse)
     
     def register_callback(self, dash_app: Dash):
         super().register_callback(dash_app)
-        
-        for child in self.children:
-            dash_app.callback(
-                    Output(child.collapse_id, "is_open"),
-                    Input(self.index, "active_tab")
-                )(self.sync_open_tab_collapse(child))
+        self.register_pattern_instance(dash_app)
 
 @dataclass
 @component_register
@@ -0,0 +1,23 @@
+import math
+
+import numpy as np
+
+
+def minmax_decimate(y, max_points: int, start: int = 0, stop: int = None):
+    y = np.asarray(y, dtype=np.float64)
+    stop = len(y) if stop is None else min(stop, len(y))
+    start = max(start, 0)
+    count = stop - start
+    if count <= max_points:
+        return np.arange(start, stop)
+    buckets = max(max_points//2, 1)
+    bucket_size = math.ceil(count/buckets)
+    padded = np.full(buckets*bucket_size, np.nan)
+    padded[:count] = y[start:stop]
+    padded = padded.reshape(buckets, bucket_size)
+    valid = ~np.all(np.isnan(padded), axis=1)
+    rows = np.flatnonzero(valid)
+    offsets = rows*bucket_size + start
+    lows = offsets + np.nanargmin(padded[valid], axis=1)
+    highs = offsets + np.nanargmax(padded[valid], axis=1)
+    return np.unique(np.concatenate([[start, stop - 1], lows, highs]))
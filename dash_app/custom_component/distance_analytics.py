@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1)/2)**2 + np.cos(lat1)*np.cos(lat2)*np.sin((lng2 - lng1)/2)**2
+    return 2*EARTH_RADIUS_KM*np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+@dataclass
+class DistanceErrorAnalytics:
+    error_data: pd.DataFrame
+    locations: pd.DataFrame
+    pair_index: Dict[Tuple[str, str], int] = field(init=False, repr=False)
+    location_stats: pd.DataFrame = field(init=False, repr=False)
+
+    def __post_init__(self):
+        src = self.error_data["srcCode"].to_numpy()
+        dest = self.error_data["destCode"].to_numpy()
+        self.pair_index = dict(zip(zip(src, dest), range(len(src))))
+        src_pos = self.locations.index.get_indexer(src)
+        dest_pos = self.locations.index.get_indexer(dest)
+        lat = np.append(self.locations["lat"].to_numpy(dtype=np.float64), np.nan)
+        lng = np.append(self.locations["lng"].to_numpy(dtype=np.float64), np.nan)
+        actual = self.error_data["actuallyDisance"].to_numpy(dtype=np.float64)
+        min_distance = self.error_data["minDistance"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(min_distance > 0, actual/min_distance, np.nan)
+        self.error_data = self.error_data.assign(
+            ratio=ratio,
+            haversineDistance=haversine(lat[src_pos], lng[src_pos], lat[dest_pos], lng[dest_pos]),
+        )
+        self.location_stats = self.build_location_stats()
+
+    def build_location_stats(self):
+        both = pd.DataFrame({
+            "locationCode": np.concatenate([self.error_data["srcCode"].to_numpy(), self.error_data["destCode"].to_numpy()]),
+            "isSrc": np.repeat([1, 0], len(self.error_data)),
+            "ratio": np.tile(self.error_data["ratio"].to_numpy(), 2),
+        })
+        stats = both.groupby("locationCode").agg(
+            errorCount=("ratio", "size"),
+            asSrc=("isSrc", "sum"),
+            meanRatio=("ratio", "mean"),
+            maxRatio=("ratio", "max"),
+        )
+        stats["asDest"] = stats["errorCount"] - stats["asSrc"]
+        return stats.sort_values("errorCount", ascending=False)
+
+    def ratio_histogram(self, bins: int = 50):
+        ratio = self.error_data["ratio"].to_numpy()
+        ratio = ratio[np.isfinite(ratio)]
+        if ratio.size == 0:
+            return np.zeros(0), np.zeros(1)
+        return np.histogram(ratio, bins=bins)
+
+    def location(self, code: str) -> Optional[dict]:
+        try:
+            row = self.locations.loc[code]
+        except KeyError:
+            return None
+        return dict(code=code, lat=row["lat"], lng=row["lng"])
+
+    def lookup(self, src: str, dest: str) -> dict:
+        info = dict(src=self.location(src), dest=self.location(dest), error=None)
+        row = self.pair_index.get((src, dest))
+        if row is not None:
+            info["error"] = self.error_data.iloc[row][["actuallyDisance", "minDistance", "haversineDistance", "ratio"]].to_dict()
+        return info
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .cache import ResponseCache
+
+MATRIX_CACHE_PATH = os.getcwd() + '/dash_app/.cache/distance_matrix/'
+MATRIX_TTL = 7*24*3600
+KEY_FIELDS = ("srcCode", "destCode")
+INT32 = np.iinfo(np.int32)
+MATRIX_FLOAT32 = os.environ.get("DASH_MATRIX_FLOAT32", "") == "1"
+
+
+def has_value(value):
+    return value is not None and value == value
+
+
+def field_column(values: List, float32: bool = False) -> np.ndarray:
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        column = np.array(values, dtype=np.int64)
+        if not column.size or (column.min() >= INT32.min and column.max() <= INT32.max):
+            return column.astype(np.int32)
+        return column
+    column = np.array(values, dtype=np.float64)
+    narrow = column.astype(np.float32)
+    return narrow if float32 or np.array_equal(narrow, column) else column
+
+
+def export_column(column: np.ndarray) -> List:
+    if column.dtype == np.float32:
+        return [float(value) for value in column.astype(str)]
+    return column.tolist()
+
+
+@dataclass
+class DistanceMatrix:
+    codes: List[str]
+    fields: Dict[str, np.ndarray]
+    present: Optional[np.ndarray] = None
+    masks: Optional[Dict[str, np.ndarray]] = None
+    position: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.position = {code: i for i, code in enumerate(self.codes)}
+        if self.present is None:
+            self.present = ~np.isnan(next(iter(self.fields.values())))
+        if self.masks is None:
+            self.masks = {}
+
+    @property
+    def nbytes(self):
+        return self.present.nbytes + sum(values.nbytes for values in (*self.fields.values(), *self.masks.values()))
+
+    @classmethod
+    def from_rows(cls, rows: List[dict], codes: Iterable[str] = (), float32: bool = False) -> Optional["DistanceMatrix"]:
+        names = [name for name in dict.fromkeys(name for row in rows for name in row) if name not in KEY_FIELDS]
+        codes = list(dict.fromkeys([*codes, *(row["srcCode"] for row in rows), *(row["destCode"] for row in rows)]))
+        position = {code: i for i, code in enumerate(codes)}
+        shape = (len(codes), len(codes))
+        fields, masks = {}, {}
+        try:
+            src = np.fromiter((position[row["srcCode"]] for row in rows), dtype=np.int32, count=len(rows))
+            dest = np.fromiter((position[row["destCode"]] for row in rows), dtype=np.int32, count=len(rows))
+            for name in names:
+                has = np.fromiter((has_value(row.get(name)) for row in rows), dtype=bool, count=len(rows))
+                column = field_column([row[name] for row, ok in zip(rows, has) if ok], float32)
+                fill = 0 if np.issubdtype(column.dtype, np.integer) else np.nan
+                matrix = np.full(shape, fill, dtype=column.dtype)
+                matrix[src[has], dest[has]] = column
+                fields[name] = matrix
+                if not has.all():
+                    mask = np.zeros(shape, dtype=bool)
+                    mask[src[has], dest[has]] = True
+                    masks[name] = mask
+        except (TypeError, ValueError):
+            return None
+        if not fields:
+            return None
+        present = np.zeros(shape, dtype=bool)
+        present[src, dest] = True
+        return cls(codes, fields, present, masks)
+
+    def indices(self, codes: Optional[Iterable[str]] = None):
+        if codes is None:
+            return np.arange(len(self.codes))
+        return np.array(sorted(self.position[code] for code in codes if code in self.position), dtype=np.int64)
+
+    def lookup(self, src: str, dest: str, name: str = "distance"):
+        i, j = self.position[src], self.position[dest]
+        if not self.present[i, j]:
+            return None
+        if name in self.masks and not self.masks[name][i, j]:
+            return None
+        value = self.fields[name][i, j].item()
+        return None if value != value else value
+
+    def to_rows(self, codes: Optional[Iterable[str]] = None) -> List[dict]:
+        idx = self.indices(codes)
+        names = list(self.fields)
+        i, j = np.nonzero(self.present[np.ix_(idx, idx)])
+        i, j = idx[i], idx[j]
+        src = [self.codes[k] for k in i]
+        dest = [self.codes[k] for k in j]
+        columns = [export_column(self.fields[name][i, j]) for name in names]
+        keys = KEY_FIELDS + tuple(names)
+        if not self.masks:
+            return [dict(zip(keys, row)) for row in zip(src, dest, *columns)]
+        for k, name in enumerate(names):
+            if name in self.masks:
+                columns[k] = [value if ok else None for value, ok in zip(columns[k], self.masks[name][i, j].tolist())]
+        return [
+            {key: value for key, value in zip(keys, row) if value is not None}
+            for row in zip(src, dest, *columns)
+        ]
+
+
+MATRIX_STORE = ResponseCache(
+    max_bytes=256 * 1024 * 1024,
+    ttl=MATRIX_TTL,
+    disk_path=MATRIX_CACHE_PATH,
+    disk_max_bytes=2 * 1024 * 1024 * 1024,
+)
+
+
+def store_matrix(raw: bytes, rows: List[dict], codes: Iterable[str] = (), float32: bool = MATRIX_FLOAT32):
+    matrix = DistanceMatrix.from_rows(rows, codes, float32)
+    if matrix is None:
+        return None
+    key = hashlib.sha1(raw + (b"float32" if float32 else b"")).hexdigest()
+    MATRIX_STORE.put(key, matrix)
+    return key
+
+
+def load_matrix(key: str) -> Optional[DistanceMatrix]:
+    matrix = MATRIX_STORE.get(key)
+    if getattr(matrix, "present", None) is None or getattr(matrix, "masks", None) is None:
+        return None
+    return matrix
+
+
+def matrix_available(data: dict):
+    key = data.get("distanceMatrix")
+    return key is None or load_matrix(key) is not None
@@ -1,59 +1,229 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+import functools
 import gzip
 import json
 import math
-from typing import List
+import os
+import threading
+from typing import Dict, List
 
 import numpy as np
+from .background import mark_failed, report_progress
 from .base_component import *
+from .cache import ResponseCache, memoize
 from .component_register import component_register
+from .decimation import minmax_decimate
+from .distance_analytics import DistanceErrorAnalytics
+from .geo import hex_bin, hex_size_for_zoom, in_bounds
+from .validate_pipeline import FetchValidatePipeline, StageTimer, extract_locations
 import dash_mantine_components as dmc
 
 import requests
 
 import pandas as pd
 import dash_bootstrap_components as dbc
-from dash import Dash, html, Input, Output, State, dcc, ctx
+from dash import Dash, html, Input, Output, State, dcc, ctx, no_update
 from plotly import graph_objects as go
 
 
 VALIDATE_SERVER = "http://127.0.0.1:5000"
 DATA_SOURCE_SERVER = "http://171.244.37.73:7000"
+CACHE_PATH = os.getcwd() + '/dash_app/.cache/distance_error/'
+MAP_MODES = ("auto", "markers", "hexbin")
+MAX_MARKER_SIZE = 30
+
+
+def line_chart(error_data: pd.DataFrame, x_range, max_points: int, uirevision: str) -> go.Figure:
+    num_error = error_data.shape[0]
+    start, stop = 0, num_error
+    if x_range is not None:
+        start = max(min(int(x_range[0]), num_error - 1), 0)
+        stop = max(min(math.ceil(x_range[1]) + 1, num_error), start + 1)
+    actual = error_data["actuallyDisance"].to_numpy()
+    min_distance = error_data["minDistance"].to_numpy()
+    x = minmax_decimate(actual, max_points, start, stop)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+            x = np.concatenate([x, x[::-1]]),
+            y = np.concatenate([2*min_distance[x], 3*min_distance[x][::-1]]),
+            fill='toself',
+            mode='none',
+            hoverinfo='skip',
+            name='2-3 x minDistance',
+            )
+        )
+    fig.add_trace(go.Scattergl(
+            x = x,
+            y = min_distance[x],
+            mode='lines',
+            name='minDistance',
+            )
+        )
+    fig.add_trace(go.Scattergl(
+            x = x,
+            y = actual[x],
+            customdata = error_data[["srcCode", "destCode"]].to_numpy()[x],
+            hovertemplate = "%{customdata[0]} -> %{customdata[1]}<br>actual: %{y} km<extra></extra>",
+            mode='lines+markers',
+            name='actuallyDisance',
+            )
+        )
+    tick_step = max(1, math.ceil((stop - start)/10))
+    tick_vals = list(range(start, stop, tick_step))
+    fig.update_layout(
+        title="Error Overview" if len(x) == stop - start else f"Error Overview ({len(x)} of {stop - start} points, zoom for detail)",
+        uirevision=uirevision,
+        xaxis = dict(
+            title_text= 'Location',
+            tickmode = 'array',
+            tickvals = tick_vals,
+            ticktext = tick_vals
+        ),
+        yaxis = dict(
+            title_text='Distance (km)',
+            tickmode = 'array',
+        ),
+    )
+    return fig
+
+
+zoomed_line_chart = memoize(key=lambda error_data, x_range, max_points, uirevision: (uirevision, x_range, max_points))(line_chart)
+
 
 @dataclass
 @component_register
 class DistanceMatrixError(FullyStructuredComponent):
+    cache_max_bytes: int = 256 * 1024 * 1024
+    cache_ttl: float = 3600
+    use_disk_cache: bool = False
+    pipelined: bool = True
+    max_workers: int = 4
+    map_mode: str = "auto"
+    max_markers: int = 2000
+    top_k: int = 200
+    map_zoom: int = 5
+    max_line_points: int = 4000
     current_id: str = field(init=False, default="")
     error_data: pd.DataFrame = field(init=False, default=None)
     locations: pd.DataFrame = field(init=False, default=None)
     line_fig: go.Figure = field(init=False, default=None)
     map_fig: go.Figure = field(init=False, default=None)
+    hist_fig: go.Figure = field(init=False, default=None)
+    stats_table: dbc.Table = field(init=False, default=None)
+    analytics: DistanceErrorAnalytics = field(init=False, default=None)
+    cache: ResponseCache = field(init=False, default=None)
+    pipeline: FetchValidatePipeline = field(init=False, default=None)
+    timings: Dict[str, Dict[str, float]] = field(init=False, default_factory=dict)
+    _lock: threading.RLock = field(init=False, repr=False, default_factory=threading.RLock)
     
     def __post_init__(self):
         super().__post_init__()
+        self.cache = ResponseCache(
+            max_bytes=self.cache_max_bytes,
+            ttl=self.cache_ttl,
+            disk_path=f'{CACHE_PATH}{self._index}' if self.use_disk_cache else '',
+        )
+        self.pipeline = FetchValidatePipeline(
+            data_server=DATA_SOURCE_SERVER,
+            validate_server=VALIDATE_SERVER,
+            max_workers=self.max_workers,
+        )
+    
+    def fetch_input(self, id):
+        raw_data = self.cache.get((id, "input"))
+        if raw_data is None:
+            res_data = requests.get(fr"{DATA_SOURCE_SERVER}/data/input/{id}")
+            if res_data.status_code != 200:
+                return None
+            raw_data = self.cache.put((id, "input"), res_data.content)
+        return raw_data
+    
+    def validate_input(self, id, input_json):
+        content = self.cache.get((id, "validation"))
+        if content is None:
+            validate_api = fr"{VALIDATE_SERVER}/vrp/validate"
+            response = requests.post(validate_api, json=input_json)
+            if response.status_code != 400:
+                return None
+            content = self.cache.put((id, "validation"), json.loads(response.content))
+        return content
+    
+    def fetch_and_validate(self, id, timer: StageTimer):
+        raw_data = self.cache.get((id, "input"))
+        content = self.cache.get((id, "validation"))
+        if raw_data is not None and content is not None:
+            with timer.stage("parse_locations"):
+                return content, extract_locations(raw_data)
+        if self.pipelined:
+            result = self.pipeline.run(id, timer)
+            if result.raw_data is not None:
+                self.cache.put((id, "input"), result.raw_data)
+            if not result.ok:
+                return None
+            self.cache.put((id, "validation"), result.validation)
+            return result.validation, result.locations
+        with timer.stage("download"):
+            raw_data = self.fetch_input(id)
+        if raw_data is None:
+            return None
+        with timer.stage("decode"):
+            input_json = json.loads(raw_data.decode('utf-8-sig'))
+        with timer.stage("validate"):
+            content = self.validate_input(id, input_json)
+        if content is None:
+            return None
+        return content, input_json["locations"]
+    
+    def build_frames(self, id, timer: StageTimer = None):
+        timer = timer or StageTimer()
+        fetched = self.fetch_and_validate(id, timer)
+        if fetched is None:
+            return None
+        content, locations = fetched
+        with timer.stage("frames"):
+            errors = content["distanceErrors"]
+            for loc in locations:
+                loc["lTypes"] = loc["lTypes"][-1]
+            error_df = pd.DataFrame.from_records(errors)
+            error_data = error_df.sort_values(by=["minDistance"])
+            locations = pd.DataFrame.from_records(locations).set_index('locationCode')
+            error_count = pd.concat([error_data.srcCode, error_data.destCode]).value_counts()
+            locations["errorCount"] = error_count.reindex(locations.index, fill_value=0).to_numpy()
+        return error_data, locations
+    
+    def load_frames(self, id):
+        timer = StageTimer()
+        frames = self.cache.get_or_set((id, "frames"), lambda: self.build_frames(id, timer))
+        if timer.timings or id not in self.timings:
+            self.timings[id] = timer.timings
+        return frames
+    
+    def prefetch(self, ids):
+        return self.pipeline.map(self.load_frames, ids)
     
     def get_data_by_id(self, id):
-        res_data = requests.get(fr"{DATA_SOURCE_SERVER}/data/input/{id}")
-        if res_data.status_code != 200:
+        frames = self.load_frames(id)
+        if frames is None:
             self.error_data = None
+            self.analytics = None
             return
-        raw_data = res_data.content
-        input_json = json.loads(raw_data.decode('utf-8-sig'))
-        validate_api = fr"{VALIDATE_SERVER}/vrp/validate"
-        response = requests.post(validate_api, json=input_json)
-        if response.status_code != 400:
-            self.error_data = None
-            return
-        content = json.loads(response.content)
-        errors = content["distanceErrors"]
-        locations = input_json["locations"]
-        for loc in locations:
-            loc["lTypes"] = loc["lTypes"][-1]
-        error_df = pd.DataFrame.from_records(errors)
-        self.error_data = error_df.sort_values(by=["minDistance"])
-        self.locations = pd.DataFrame.from_records(locations).set_index('locationCode')
+        self.error_data, self.locations = frames
+        self.analytics = self.cache.get_or_set(
+            (id, "analytics"),
+            lambda: DistanceErrorAnalytics(self.error_data, self.locations),
+        )
+    
+    def timing_report(self, ids):
+        report = []
+        for id in ids:
+            timings = self.timings.get(id)
+            if timings is None:
+                continue
+            stages = " | ".join(f"{stage}: {1000*seconds:.0f} ms" for stage, seconds in timings.items())
+            report.append(html.Div([html.B(f"{id}: "), html.Span(stages or "cached")]))
+        return report
     
     @property
     def id_input(self):
@@ -71,6 +241,10 @@ class DistanceMatrixError(FullyStructuredComponent):
     def btn_submit_id(self):
         return f"{self._index}-btn-id"
     
+    @property
+    def timing_id(self):
+        return f"{self._index}-timing"
+    
     @property
     def btn_submit_loc(self):
         return f"{self._index}-btn-loc"
@@ -80,12 +254,14 @@ class DistanceMatrixError(FullyStructuredComponent):
         return html.Div(
             children=[
                 dbc.Label("ID:"),
-                dbc.Input(id=self.id_input, placeholder="Input Id...", type="text", style={"width":"200px", "margin-bottom":"8px"}),
+                dbc.Input(id=self.id_input, placeholder="Input Id (comma separated for batch)...", type="text", style={"width":"400px", "margin-bottom":"8px"}),
                 dbc.Button(
                     "Submit",
                     id=self.btn_submit_id,
                     type="submit"
                 ),
+                self.progress_bar,
+                html.Div(id=self.timing_id, style={"margin-top":"8px"}),
             ],
     )
 
@@ -130,29 +306,74 @@ class DistanceMatrixError(FullyStructuredComponent):
                     className="g-2",
                     )
                 ),
-            html.Div([
+            html.Div(id=self.loc_info_id, children=self.location_info()),
+        ])
+    
+    @property
+    def loc_info_id(self):
+        return f"{self._index}-loc-info"
+    
+    @staticmethod
+    def maps_link(loc):
+        if loc is None:
+            return ""
+        url = f"https://www.google.com/maps?q={loc['lat']},{loc['lng']}"
+        return html.A(url, href=url, target="_blank")
+    
+    def location_info(self, info=None):
+        info = info or dict(src=None, dest=None, error=None)
+        src, dest, error = info["src"], info["dest"], info["error"]
+        direction = ""
+        if src is not None and dest is not None:
+            url = f"https://www.google.com/maps/dir/{src['lat']},{src['lng']}/{dest['lat']},{dest['lng']}"
+            direction = html.A(url, href=url, target="_blank")
+        error_text = ""
+        if error is not None:
+            error_text = (f"actual: {error['actuallyDisance']:.2f} km | min: {error['minDistance']:.2f} km | "
+                          f"haversine: {error['haversineDistance']:.2f} km | ratio: {error['ratio']:.2f}")
+        elif src is not None and dest is not None:
+            error_text = "No distance error for this pair."
+        return html.Div([
                 dbc.Row(
                     [
-                        dbc.Col("src lat:"),
-                        dbc.Col("dest lat:"),
+                        dbc.Col(f"src lat: {src['lat'] if src else ''}"),
+                        dbc.Col(f"dest lat: {dest['lat'] if dest else ''}"),
                     ]),
                 dbc.Row(
                     [
-                        dbc.Col("src lon:"),
-                        dbc.Col("dest lon:"),
+                        dbc.Col(f"src lon: {src['lng'] if src else ''}"),
+                        dbc.Col(f"dest lon: {dest['lng'] if dest else ''}"),
                     ]),
                 dbc.Row(
                     [
-                        dbc.Col("src google maps:"),
-                        dbc.Col("dest google maps:"),
+                        dbc.Col(["src google maps: ", self.maps_link(src)]),
+                        dbc.Col(["dest google maps: ", self.maps_link(dest)]),
                     ]),
                 dbc.Row(
                     [
-                        dbc.Col("direction:")
-                    ])
+                        dbc.Col(["direction: ", direction])
+                    ]),
+                dbc.Row(
+                    [
+                        dbc.Col(f"error: {error_text}")
+                    ]),
             ]
             )
-        ])
+    
+    def location_lookup(self):
+        def func(n, src, dest, value):
+            if not n or not self.ensure_loaded(value):
+                return no_update
+            return self.location_info(self.analytics.lookup((src or "").strip(), (dest or "").strip()))
+        return func
+    
+    @property
+    def hist_fig_index(self):
+        return f"{self._index}-hfig"
+    
+    @property
+    def stats_table_id(self):
+        return f"{self._index}-stats"
     
     @property
     def body(self):
@@ -160,99 +381,181 @@ class DistanceMatrixError(FullyStructuredComponent):
             dbc.Collapse(self.collapse_content, id=self.collapse_id, is_open=False, style=dict(margin="8px")),
             dcc.Graph(id=self.line_fig_index, style=dict(margin="8px")),
             dcc.Graph(id=self.map_fig_index, style=dict(margin="8px")),
+            dcc.Graph(id=self.hist_fig_index, style=dict(margin="8px")),
+            html.Div(id=self.stats_table_id, style=dict(margin="8px")),
     ])
     
-    def draw_line_chart(self):
-        num_error = self.error_data.shape[0]
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-                x = list(range(num_error)),
-                y = self.error_data["actuallyDisance"],
-                mode='lines+markers',
-                name='actuallyDisance',
-                )
-            )
-        fig.add_trace(go.Scatter(
-                x = list(range(num_error)),
-                y = self.error_data["minDistance"],
-                mode='lines',
-                name='minDistance',
-                )
-            )
-        fig.add_trace(go.Scatter(
-                x = list(range(num_error)),
-                y = 2*self.error_data["minDistance"],
-                mode='lines',
-                name='2 x minDistance',
-                )
-            )
-        fig.add_trace(go.Scatter(
-                x = list(range(num_error)),
-                y = 3*self.error_data["minDistance"],
-                mode='lines',
-                name='3 x minDistance',
-                )
-            )
-        tick_step = math.ceil(num_error/10)
-        tick_vals = list(range(0, num_error, tick_step))
+    def draw_line_chart(self, x_range=None):
+        if x_range is not None:
+            return zoomed_line_chart(self.error_data, tuple(x_range), self.max_line_points, self.current_id)
+        self.line_fig = line_chart(self.error_data, None, self.max_line_points, self.current_id)
+        return self.line_fig
+    
+    def update_line_detail(self):
+        def func(relayout_data, value):
+            if not relayout_data or not self.ensure_loaded(value):
+                return no_update
+            if relayout_data.get("xaxis.autorange"):
+                return self.line_fig
+            if "xaxis.range[0]" not in relayout_data:
+                return no_update
+            if self.error_data.shape[0] <= self.max_line_points:
+                return no_update
+            x_range = (relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"])
+            return self.draw_line_chart(x_range)
+        return func
+    
+    def draw_ratio_histogram(self, bins: int = 50):
+        counts, edges = self.analytics.ratio_histogram(bins)
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:])/2,
+            y=counts,
+            width=np.diff(edges),
+            name='actual / min',
+        ))
         fig.update_layout(
-            title="Error Overview",
-            xaxis = dict(
-                title_text= 'Location',
-                tickmode = 'array',
-                tickvals = tick_vals,
-                ticktext = tick_vals
-            ),
-            yaxis = dict(
-                title_text='Distance (km)',
-                tickmode = 'array',
-            ),
+            title="Distance Ratio Distribution",
+            xaxis=dict(title_text='actuallyDisance / minDistance'),
+            yaxis=dict(title_text='Pairs'),
         )
-        self.line_fig = fig
+        self.hist_fig = fig
+        return fig
     
-    def draw_map_chart(self):
-        fig = go.Figure()
-        src_count = self.error_data.srcCode.value_counts()
-        dest_count = self.error_data.destCode.value_counts()
-        total_error = src_count + dest_count
-        self.locations["errorCount"] = total_error
-        self.locations["errorCount"] = self.locations.errorCount.fillna(0)
-        
-        fig.add_trace(go.Scattermapbox(
-            lon=self.locations['lng'],
-            lat=self.locations['lat'],
-            hovertext=self.locations.index,
+    def draw_stats_table(self, top: int = 20):
+        stats = self.analytics.location_stats.head(top).round(2).reset_index()
+        self.stats_table = dbc.Table.from_dataframe(stats, striped=True, bordered=True, hover=True, size="sm")
+        return self.stats_table
+    
+    def use_hexbin(self):
+        if self.map_mode == "auto":
+            return self.locations.shape[0] > self.max_markers
+        return self.map_mode == "hexbin"
+    
+    def marker_trace(self, locations: pd.DataFrame, name: str):
+        counts = locations["errorCount"].to_numpy()
+        peak = counts.max() if counts.size else 0
+        sizes = MAX_MARKER_SIZE*np.sqrt(counts/peak) if peak else counts
+        return go.Scattermapbox(
+            lon=locations['lng'],
+            lat=locations['lat'],
+            hovertext=[f"{code}: {count} errors" for code, count in zip(locations.index, counts)],
             hoverinfo='text',
             mode='markers',
+            name=name,
             marker=dict(
-                size=self.locations["errorCount"],
-                sizemin=0.1,
+                size=sizes,
+                sizemin=2,
+                color=counts,
+                colorscale="Reds",
             )
-        ))
+        )
+    
+    def hexbin_traces(self, zoom, bounds=None):
+        errors = self.locations[self.locations.errorCount > 0]
+        visible = errors[in_bounds(errors.lat, errors.lng, bounds)]
+        size = hex_size_for_zoom(zoom)
+        lat, lng, totals, counts = hex_bin(visible.lat, visible.lng, visible.errorCount, size)
+        density = go.Densitymapbox(
+            lat=lat,
+            lon=lng,
+            z=totals,
+            radius=20,
+            colorscale="YlOrRd",
+            hovertext=[f"{int(total)} errors at {count} locations" for total, count in zip(totals, counts)],
+            hoverinfo='text',
+            name='Error density',
+        )
+        worst = visible.nlargest(self.top_k, "errorCount")
+        return [density, self.marker_trace(worst, f'Top {self.top_k} locations')]
+    
+    def draw_map_chart(self, zoom=None, center=None, bounds=None):
+        zoom = self.map_zoom if zoom is None else zoom
+        if center is None:
+            center = {'lon': self.locations.iloc[0].lng, 'lat': self.locations.iloc[0].lat}
+        fig = go.Figure()
+        if self.use_hexbin():
+            fig.add_traces(self.hexbin_traces(zoom, bounds))
+        else:
+            fig.add_trace(self.marker_trace(self.locations, 'Locations'))
         fig.update_layout(
             title="Error Map Density",
             paper_bgcolor="LightSteelBlue",
-            autosize=False,
+            autosize=True,
             height=900,
-            width=900,
             margin=dict(l=20, r=20, t=50, b=50),
+            uirevision=self.current_id,
             mapbox = {
-                'center': {'lon': self.locations.iloc[0].lng, 'lat': self.locations.iloc[0].lat},
+                'center': center,
                 'style': "open-street-map",
-                'zoom': 5}
+                'zoom': zoom}
         )
         self.map_fig = fig
-     
+        return fig
+    
+    def update_map_detail(self):
+        def func(relayout_data, value):
+            if not relayout_data or not self.ensure_loaded(value) or not self.use_hexbin():
+                return no_update
+            zoom = relayout_data.get("mapbox.zoom")
+            if zoom is None:
+                return no_update
+            level = int(zoom)
+            center = relayout_data.get("mapbox.center")
+            bounds = relayout_data.get("mapbox._derived", {}).get("coordinates")
+            return self.draw_map_chart(level, center, bounds)
+        return func
+    
+    @property
+    def process_safe(self):
+        return self.use_disk_cache
+    
+    def locked(self, func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            with self._lock:
+                return func(*args)
+        return wrapper
+    
+    @staticmethod
+    def parse_ids(value):
+        return [id.strip() for id in (value or "").split(",") if id.strip()]
+    
+    def show(self, id):
+        report_progress(10, f"Loading {id}")
+        self.get_data_by_id(id)
+        if self.error_data is None:
+            return False
+        self.current_id = id
+        figures = self.cache.get((id, "figures"))
+        if figures is None:
+            report_progress(60, "Drawing charts")
+            figures = self.cache.put((id, "figures"), (
+                self.draw_line_chart(),
+                self.draw_map_chart(),
+                self.draw_ratio_histogram(),
+                self.draw_stats_table(),
+            ))
+        self.line_fig, self.map_fig, self.hist_fig, self.stats_table = figures
+        return True
+    
+    def ensure_loaded(self, value):
+        ids = self.parse_ids(value)
+        if not ids:
+            return False
+        if ids[0] != self.current_id:
+            return self.show(ids[0])
+        return self.error_data is not None
+    
     def update_figure(self):
-        def func(n, id):
-            if n and self.current_id != id:
-                self.get_data_by_id(id)
-                if self.error_data is None:
-                    return None, None, False
-                self.current_id = id
-                self.draw_line_chart()
-                self.draw_map_chart()
-            return self.line_fig, self.map_fig, True
+        def func(n, value):
+            ids = self.parse_ids(value)
+            if n and ids and self.current_id != ids[0]:
+                if len(ids) > 1:
+                    self.prefetch(ids)
+                if not self.show(ids[0]):
+                    mark_failed()
+                    return None, None, None, None, False, self.timing_report(ids)
+            return self.line_fig, self.map_fig, self.hist_fig, self.stats_table, True, self.timing_report(ids)
         return func
     
     def register_callback(self, dash_app: Dash):
@@ -260,8 +563,32 @@ class DistanceMatrixError(FullyStructuredComponent):
         dash_app.callback(
             Output(self.line_fig_index, "figure"),
             Output(self.map_fig_index, "figure"),
+            Output(self.hist_fig_index, "figure"),
+            Output(self.stats_table_id, "children"),
             Output(self.collapse_id, "is_open"),
+            Output(self.timing_id, "children"),
             Input(self.btn_submit_id, "n_clicks"),
             State(self.id_input, "value"),
             prevent_initial_call=True,
-        )(self.update_figure())
\ No newline at end of file
+            **self.background_options(cache_args_to_ignore=[0]),
+        )(self.locked(self.update_figure()))
+        dash_app.callback(
+            Output(self.map_fig_index, "figure", allow_duplicate=True),
+            Input(self.map_fig_index, "relayoutData"),
+            State(self.id_input, "value"),
+            prevent_initial_call=True,
+        )(self.locked(self.update_map_detail()))
+        dash_app.callback(
+            Output(self.line_fig_index, "figure", allow_duplicate=True),
+            Input(self.line_fig_index, "relayoutData"),
+            State(self.id_input, "value"),
+            prevent_initial_call=True,
+        )(self.locked(self.update_line_detail()))
+        dash_app.callback(
+            Output(self.loc_info_id, "children"),
+            Input(self.btn_submit_loc, "n_clicks"),
+            State(self.src_loc_input, "value"),
+            State(self.dest_loc_input, "value"),
+            State(self.id_input, "value"),
+            prevent_initial_call=True,
+        )(self.locked(self.location_lookup()))
\ No newline at end of file
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LOAD_FIELDS = ("weight", "cbm", "itemCost")
+LIMIT_FIELDS = ("capacity", "cbm")
+
+
+def trip_loads(trip_requests: Dict[str, dict]) -> np.ndarray:
+    counts = []
+    values = []
+    for requests in trip_requests.values():
+        n = 0
+        for req in requests.values():
+            for item in req["items"]:
+                values.append([item.get(name) or 0.0 for name in LOAD_FIELDS])
+                n += 1
+        counts.append(n)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    values = np.array(values, dtype=np.float64).reshape(-1, len(LOAD_FIELDS))
+    return np.stack([
+        np.bincount(owner, weights=values[:, k], minlength=len(counts)) for k in range(len(LOAD_FIELDS))
+    ], axis=1)
+
+
+def vehicle_limits(vehicles: List[dict]) -> np.ndarray:
+    limits = np.array(
+        [[veh.get(name) or np.inf for name in LIMIT_FIELDS] for veh in vehicles], dtype=np.float64,
+    ).reshape(-1, len(LIMIT_FIELDS))
+    limits[limits <= 0] = np.inf
+    return limits
+
+
+@dataclass
+class Feasibility:
+    trips: List[str]
+    vehicles: List[dict]
+    loads: np.ndarray
+    limits: np.ndarray
+    candidates: np.ndarray
+    fits: np.ndarray = field(init=False, repr=False)
+    usage: np.ndarray = field(init=False, repr=False)
+    proposed: np.ndarray = field(init=False, repr=False)
+    feasible: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        demand = self.loads[:, None, :len(LIMIT_FIELDS)]
+        self.fits = (demand <= self.limits[None]).all(axis=2)
+        self.usage = (demand / self.limits[None]).max(axis=2)
+        own = np.where(self.candidates & self.fits, self.usage, -1.0)
+        other = np.where(self.fits, self.usage, -1.0)
+        first = np.where(self.candidates.any(axis=1), self.candidates.argmax(axis=1), -1)
+        self.feasible = own.max(axis=1, initial=-1.0) >= 0
+        fallback = np.where(other.max(axis=1, initial=-1.0) >= 0, other.argmax(axis=1) if other.size else -1, first)
+        self.proposed = np.where(self.feasible, own.argmax(axis=1) if own.size else -1, fallback)
+
+    def vehicle_code(self, j) -> Optional[str]:
+        return self.vehicles[j]["vehicleCode"] if j >= 0 else None
+
+    def assignment(self) -> Dict[str, Optional[str]]:
+        return {trip: self.vehicle_code(j) for trip, j in zip(self.trips, self.proposed.tolist())}
+
+    def violations(self) -> List[dict]:
+        largest = np.where(self.candidates[:, :, None], self.limits[None], -np.inf).max(axis=1, initial=-np.inf)
+        found = []
+        for i in np.flatnonzero(~self.feasible).tolist():
+            j = int(self.proposed[i])
+            found.append(dict(
+                trip=self.trips[i],
+                **dict(zip(LOAD_FIELDS, self.loads[i].tolist())),
+                limits=dict(zip(LIMIT_FIELDS, largest[i].tolist())),
+                proposed=self.vehicle_code(j),
+                fits=bool(j >= 0 and self.fits[i, j]),
+            ))
+        return found
+
+
+def check_feasibility(cur_data: dict) -> Feasibility:
+    trips = list(cur_data.get("tripRequest", {}))
+    vehicles = [veh for vendor in cur_data["vehicles"].values() for trucks in vendor.values() for veh in trucks]
+    column = {veh["vehicleCode"]: j for j, veh in enumerate(vehicles)}
+    candidates = np.zeros((len(trips), len(vehicles)), dtype=bool)
+    for i, trip in enumerate(trips):
+        cols = [column[veh["vehicleCode"]] for veh in cur_data["tripVehicle"].get(trip, []) if veh["vehicleCode"] in column]
+        candidates[i, cols] = True
+    return Feasibility(trips, vehicles, trip_loads(cur_data.get("tripRequest", {})), vehicle_limits(vehicles), candidates)
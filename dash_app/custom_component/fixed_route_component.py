@@ -1,26 +1,28 @@
-import base64
 from collections import defaultdict
+import copy
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-import gzip
-import io
 import json
 import math
 import time
 from typing import List
 
-import numpy as np
+from .background import mark_failed, report_progress
 from .base_component import *
+from .cache import digest, memoize
+from .chunked_upload import (
+    UPLOAD_CACHE, chunked_upload, open_upload, register_chunked_upload, upload_digest, upload_file_id, upload_source,
+)
+from .distance_matrix import matrix_available, store_matrix
+from .feasibility import check_feasibility
+from .route_export import MatrixExpiredError, build_distance_index, build_payload, export_archive, route_payload, stamp_payload
 from .routes import SharedDataStep
+from .store_patch import snapshot, store_update
 from .component_register import component_register
 import dash_mantine_components as dmc
 
-import requests
-
-import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import Dash, html, Input, Output, State, dcc, ctx, no_update
-from plotly import graph_objects as go
 
 VENDOR_CONVERT = {
     "NL": "nhat long",
@@ -45,6 +47,20 @@ CAPACITY_CONVERT = {
     "VR": "VAN",
 }
 
+MAX_VIOLATION_ALERTS = 20
+
+def trips_digest(cur_data):
+    return digest((cur_data["tripRequest"], cur_data["tripVehicle"], cur_data.get("tripAssignment")))
+
+def upload_success(filename, alert=None):
+    return html.Div([
+            html.H5([
+                html.Span(f"{filename}"),
+                html.Span(" upload sucessfully!", style=dict(color="green"))
+                ]),
+            # html.H6(datetime.fromtimestamp(date)),
+        ] + (alert or []))
+
 @dataclass
 @component_register
 class JsonUploader(SharedDataStep):
@@ -62,8 +78,8 @@ class JsonUploader(SharedDataStep):
     
     def make_layout(self):
         return html.Div([
-            dcc.Upload(
-                id=self.upload_id,
+            chunked_upload(
+                self.upload_id,
                 children=html.Div([
                     'Drag and Drop or ',
                     html.A('Select JSON Input')
@@ -80,6 +96,7 @@ class JsonUploader(SharedDataStep):
                 },
                 multiple=False,
             ),
+            self.progress_bar,
             html.Div(id=self.upload_output),
         ])
     
@@ -99,16 +116,21 @@ class JsonUploader(SharedDataStep):
         )
     
     def parse_contents(self, contents, filename):
-        content_type, content_string = contents.split(',')
-
-        decoded = base64.b64decode(content_string)
         try:
+            digest = upload_digest(contents)
+            cached = UPLOAD_CACHE.get(("json", digest))
+            if cached is not None and matrix_available(cached):
+                return cached, upload_success(filename)
+            with open_upload(contents, filename) as (content_type, f):
+                decoded = f.read()
             if 'json' in content_type:
+                report_progress(10, "Reading JSON")
                 data = json.loads(decoded.decode('utf-8-sig'))
                 requests = data.get("requests", [])
                 master_requests = {}
                 master_items = {}
-                for req in requests:
+                for i, req in enumerate(requests):
+                    report_progress(20 + 60*i//len(requests), f"Requests {i}/{len(requests)}")
                     req["itemGroupList"] = []
                     orderCode = req["orderCode"]
                     orderCode = orderCode.split("_")[0]
@@ -125,6 +147,7 @@ class JsonUploader(SharedDataStep):
                         req["orderCode"] = orderCode
                         req["items"] = new_items
                         master_requests[orderCode] = req
+                report_progress(80, "Vehicles")
                 vehicles = data.get("vehicles")
                 master_vehicles = defaultdict(dict)
                 for veh in vehicles:
@@ -136,6 +159,7 @@ class JsonUploader(SharedDataStep):
                     try:
                         truck = CAPACITY_CONVERT[c]
                     except KeyError:
+                        mark_failed()
                         return no_update, html.Div("Need more vehicle info")
                     try:
                         master_vehicles[trans][truck].append(veh)
@@ -144,25 +168,32 @@ class JsonUploader(SharedDataStep):
                 data["requests"] = master_requests
                 data["vehicles"] = master_vehicles
                 data["items"] = master_items
+                report_progress(90, "Indexing distances")
+                location_codes = [loc.get("locationCode") for loc in data.get("locations", [])]
+                matrix_key = store_matrix(decoded, data.get("distances", []), location_codes)
+                if matrix_key is None:
+                    data["distances"], data["distanceIndex"] = build_distance_index(data.get("distances", []))
+                else:
+                    data.pop("distances", None)
+                    data["distanceMatrix"] = matrix_key
+                data["inputDigest"] = digest
+                UPLOAD_CACHE.put(("json", digest), data)
         except Exception as e:
+            mark_failed()
             return no_update, html.Div([
                 'There was an error processing this file.',
                 f'{type(e)}: {e.args}'
             ])
 
-        return data, html.Div([
-                html.H5([
-                    html.Span(f"{filename}"),
-                    html.Span(" upload sucessfully!", style=dict(color="green"))
-                    ]),
-                # html.H6(datetime.fromtimestamp(date)),
-            ])
+        return data, upload_success(filename)
         
     def uploader(self):
-        def update_output(content, name):
+        def update_output(content, upload, name):
+            content, name = upload_source(self.upload_id, content, upload, name)
             if content is not None:
                 children = self.parse_contents(content, name)
                 return children
+            return no_update, no_update
         return update_output
     
     def register_callback(self, dash_app: Dash):
@@ -171,10 +202,13 @@ class JsonUploader(SharedDataStep):
             Output('session-storage', 'data', allow_duplicate=True),
             Output(self.upload_output, 'children'),
             Input(self.upload_id, 'contents'),
+            Input(upload_file_id(self.upload_id), 'data'),
             State(self.upload_id, 'filename'),
             prevent_initial_call=True,
             allow_duplicate=True,
+            **self.background_options(),
         )(self.uploader())
+        register_chunked_upload(dash_app, self.upload_id)
         
 @dataclass
 @component_register
@@ -193,8 +227,8 @@ class XlsxUploader(SharedDataStep):
     
     def make_layout(self):
         return html.Div([
-            dcc.Upload(
-                id=self.upload_id,
+            chunked_upload(
+                self.upload_id,
                 children=html.Div([
                     'Drag and Drop or ',
                     html.A('Select Excel Manual')
@@ -211,6 +245,7 @@ class XlsxUploader(SharedDataStep):
                 },
                 multiple=False,
             ),
+            self.progress_bar,
             html.Div(id=self.upload_output),
         ])
     
@@ -228,20 +263,48 @@ class XlsxUploader(SharedDataStep):
             itemCost = true_qtt*item["cost"],
         ), leftover_quantity - true_qtt
     
+    @staticmethod
+    def violation_alerts(violations: List[dict]):
+        alerts = []
+        for v in violations[:MAX_VIOLATION_ALERTS]:
+            load = f'{v["weight"]:.0f} kg, {v["cbm"]:.2f} cbm'
+            if not v["fits"]:
+                alerts.append(html.Div(f'Chuyến [{v["trip"]}] ({load}) không có xe nào đủ tải.', style=dict(color="red")))
+            elif not math.isfinite(v["limits"]["capacity"]):
+                alerts.append(html.Div(f'Chuyến [{v["trip"]}] ({load}) chưa có xe, đề xuất xe [{v["proposed"]}].'))
+            else:
+                limit = f'{v["limits"]["capacity"]:.0f} kg, {v["limits"]["cbm"]:.2f} cbm'
+                alerts.append(html.Div(
+                    f'Chuyến [{v["trip"]}] vượt tải loại xe đã chọn ({load} / {limit}), đề xuất xe [{v["proposed"]}].',
+                    style=dict(color="orange"),
+                ))
+        if len(violations) > MAX_VIOLATION_ALERTS:
+            alerts.append(html.Div(f'... và {len(violations) - MAX_VIOLATION_ALERTS} chuyến vượt tải khác.'))
+        return alerts
+    
     def parse_contents(self, contents, filename, cur_data):
-        content_type, content_string = contents.split(',')
-
-        decoded = base64.b64decode(content_string)
+        import pandas as pd
+        input_digest = (cur_data or {}).get("inputDigest")
+        alert = []
+        pristine = None
         try:
-            if 'csv' in content_type:
-                df = pd.read_csv(
-                    io.StringIO(decoded.decode('utf-8')))
+            key = ("manual", input_digest, upload_digest(contents))
+            if input_digest is not None:
+                cached = UPLOAD_CACHE.get(key)
+                if cached is not None and matrix_available(cached[0]):
+                    return cached[0], upload_success(filename, cached[1])
+                pristine = UPLOAD_CACHE.get(("json", input_digest))
+            with open_upload(contents, filename) as (content_type, f):
+                df = pd.read_csv(f, encoding='utf-8') if 'csv' in content_type else None
+            if df is not None:
+                cur_data = copy.deepcopy(pristine) if pristine is not None else snapshot(cur_data)
                 df.rename(columns=lambda x: x.strip(), inplace=True)
                 tripNo = -1
                 tripRequest = {}
                 tripVehicle = {}
                 alert = []
                 for i, row in df.iterrows():
+                    report_progress(10 + 80*i//len(df), f"Rows {i}/{len(df)}")
                     if pd.notna(row.truckType):
                         tripNo += 1
                         try:
@@ -287,25 +350,27 @@ class XlsxUploader(SharedDataStep):
                     req["items"] = new_items
                 cur_data["tripRequest"] = tripRequest
                 cur_data["tripVehicle"] = tripVehicle
+                feasibility = check_feasibility(cur_data)
+                cur_data["tripAssignment"] = feasibility.assignment()
+                alert += self.violation_alerts(feasibility.violations())
+                if input_digest is not None:
+                    UPLOAD_CACHE.put(key, (cur_data, alert))
         except Exception as e:
+            mark_failed()
             return no_update, html.Div([
                 'There was an error processing this file.',
                 f'{type(e)}: {e.args}'
             ] + alert)
 
-        return cur_data, html.Div([
-                html.H5([
-                    html.Span(f"{filename}"),
-                    html.Span(" upload sucessfully!", style=dict(color="green"))
-                    ]),
-                # html.H6(datetime.fromtimestamp(date)),
-            ] + alert)
+        return cur_data, upload_success(filename, alert)
         
     def uploader(self):
-        def update_output(content, name, cur_data):
+        def update_output(content, upload, name, cur_data):
+            content, name = upload_source(self.upload_id, content, upload, name)
             if content is not None:
-                children = self.parse_contents(content, name, cur_data)
-                return children
+                data, children = self.parse_contents(content, name, cur_data)
+                return store_update(cur_data, data), children
+            return no_update, no_update
         return update_output
     
     def register_callback(self, dash_app: Dash):
@@ -314,10 +379,13 @@ class XlsxUploader(SharedDataStep):
             Output('session-storage', 'data', allow_duplicate=True),
             Output(self.upload_output, 'children'),
             Input(self.upload_id, 'contents'),
+            Input(upload_file_id(self.upload_id), 'data'),
             State(self.upload_id, 'filename'),
             State('session-storage', 'data'),
             prevent_initial_call=True,
+            **self.background_options(),
         )(self.uploader())
+        register_chunked_upload(dash_app, self.upload_id)
 
 
 @dataclass
@@ -343,6 +411,10 @@ class Downloader(SharedDataStep):
     def refresh_id(self):
         return f'refresh-{self.index}'
     
+    @property
+    def archive_id(self):
+        return f'archive-{self.index}'
+    
     def make_layout(self):
         return html.Div([
             dmc.Button("Refresh", id=self.refresh_id),
@@ -357,9 +429,13 @@ class Downloader(SharedDataStep):
             dcc.Loading([
                 dmc.Button("Download", id=self.download_id),
                 dcc.Download(id="download-text"),
+                dmc.Button("Download all (zip)", id=self.archive_id),
+                dcc.Download(id=f"{self.archive_id}-file"),
+                html.Div(id=f"{self.archive_id}-text"),
                 dmc.Button("Run", id=self.run_id),
                 html.Div(id="output-text")
-            ])
+            ]),
+            self.progress_bar,
         ])
     
     def selecter(self):
@@ -374,61 +450,51 @@ class Downloader(SharedDataStep):
     
     @staticmethod
     def get_json(value, cur_data):
-        if value != "all":
-            requests = list(cur_data["tripRequest"].get(value, {}).values())
-            vehicles = cur_data["tripVehicle"].get(value, [])
-            for req in requests:
-                req["assignedVehicle"] = None
-                req["tripNo"] = value
-        else:
-            requests = []
-            vehicles = []
-            for vendor in cur_data["vehicles"].values():
-                for veh in vendor.values():
-                    vehicles += veh
-            for key in cur_data["tripRequest"].keys():
-                _reqs = list(cur_data["tripRequest"][key].values())
-                _vehs = cur_data["tripVehicle"][key]
-                for req in _reqs:
-                    req["orderCode"] = req["orderCode"] + key
-                    req["assignedVehicle"] = _vehs[0]["vehicleCode"]
-                    req["tripNo"] = key
-                requests += _reqs
-            requests += list(req for req in cur_data["requests"].values() if len(req["items"]))
-            
-        algoParams = cur_data["algoParams"]
         name = f"M{int(time.time())}"
-        algoParams["trackingId"] += f"_{name}_{value}"
-        data = dict(
-            customers=cur_data["customers"],
-            depots=cur_data["depots"],  
-            distances=cur_data["distances"],  
-            locations=cur_data["locations"],  
-            matrixConfig=cur_data["matrixConfig"],  
-            algoParams=algoParams,  
-            routingFee=cur_data["routingFee"],  
-            requests=requests,
-            vehicles=vehicles,
-        )
-        return data, name
+        return build_payload(value, cur_data, name), name
         
-    def downloader(self):
-        def update_output(n, value, cur_data):
-            if ctx.triggered_id == self.download_id:
-                data, name = self.get_json(value, cur_data)
-                json_data = json.dumps(data)
-                return dict(content=json_data, filename=f'{name}.json')
-            return no_update
+    @memoize(key=lambda self, cur_data: (self, cur_data["inputDigest"], trips_digest(cur_data)))
+    def all_routes_payload(self, cur_data):
+        return route_payload("all", cur_data)
+    
+    def download_payload(self, value, cur_data):
+        name = f"M{int(time.time())}"
+        if value == "all" and cur_data.get("inputDigest") is not None:
+            payload = self.all_routes_payload(cur_data)
+        else:
+            payload = route_payload(value, cur_data)
+        data = stamp_payload(payload, name, value)
+        return dict(content=json.dumps(data), filename=f'{name}.json')
+    
+    def archiver(self):
+        def update_output(n, cur_data):
+            if not (n and cur_data):
+                return no_update, no_update
+            name = f"M{int(time.time())}"
+            try:
+                content = export_archive(
+                    cur_data, name,
+                    progress=lambda done, total: report_progress(100*done//total, f"Routes {done}/{total}"),
+                )
+            except MatrixExpiredError as e:
+                mark_failed()
+                return no_update, str(e)
+            return dcc.send_bytes(content, f"{name}.zip"), no_update
         return update_output
     
     def runner(self):
-        def update_output(n, value, cur_data):
+        def update_output(n_download, value, n_run, cur_data):
             import requests
-            if ctx.triggered_id == self.run_id:
-                data, name = self.get_json(value, cur_data)
-                requests.post("http://171.244.37.73:7000/vrp/fixed_route_internal", json=data, headers={"Content-Type":"application/json"})
-                return name
-            return ""
+            try:
+                if ctx.triggered_id == self.download_id:
+                    return self.download_payload(value, cur_data), no_update
+                if ctx.triggered_id == self.run_id:
+                    data, name = self.get_json(value, cur_data)
+                    requests.post("http://171.244.37.73:7000/vrp/fixed_route_internal", json=data, headers={"Content-Type":"application/json"})
+                    return no_update, name
+            except MatrixExpiredError as e:
+                return no_update, str(e)
+            return no_update, ""
         return update_output
     
     def register_callback(self, dash_app: Dash):
@@ -438,15 +504,19 @@ class Downloader(SharedDataStep):
             Input(self.refresh_id, 'n_clicks'),
             Input('session-storage', 'data'),
         )(self.selecter())
+        dash_app.callback(
+            Output(f"{self.archive_id}-file", "data"),
+            Output(f"{self.archive_id}-text", "children"),
+            Input(self.archive_id, 'n_clicks'),
+            State('session-storage', 'data'),
+            prevent_initial_call=True,
+            **self.background_options(),
+        )(self.archiver())
         dash_app.callback(
             Output("download-text", "data"),
+            Output("output-text", "children"),
             Input(self.download_id, 'n_clicks'),
             Input(self.select_id, 'value'),
-            Input('session-storage', 'data'),
-        )(self.downloader())
-        dash_app.callback(
-            Output("output-text", "children"),
             Input(self.run_id, 'n_clicks'),
-            Input(self.select_id, 'value'),
-            Input('session-storage', 'data'),
+            State('session-storage', 'data'),
         )(self.runner())
\ No newline at end of file
@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+SQRT3 = math.sqrt(3)
+HEX_CELLS_PER_TILE = 6
+
+
+def hex_size_for_zoom(zoom: float) -> float:
+    return 360/(2**max(zoom, 0))/HEX_CELLS_PER_TILE
+
+
+def hex_bin(lat, lng, weights=None, size: float = 1.0):
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    weights = np.ones_like(lat) if weights is None else np.asarray(weights, dtype=np.float64)
+    if lat.size == 0:
+        empty = np.empty(0)
+        return empty, empty, empty, empty.astype(np.int64)
+    scale = math.cos(math.radians(float(np.nanmean(lat))))
+    x = lng*scale/size
+    y = lat/size
+    q = (SQRT3/3*x - y/3)
+    r = (2/3*y)
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    cells = np.stack([rq, rr], axis=1).astype(np.int64)
+    keys, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = np.bincount(inverse, weights=weights, minlength=len(keys))
+    counts = np.bincount(inverse, minlength=len(keys))
+    center_x = SQRT3*(keys[:, 0] + keys[:, 1]/2)*size
+    center_y = 1.5*keys[:, 1]*size
+    return center_y, center_x/scale, totals, counts
+
+
+def in_bounds(lat, lng, bounds):
+    if not bounds:
+        return np.ones(len(lat), dtype=bool)
+    lngs = [point[0] for point in bounds]
+    lats = [point[1] for point in bounds]
+    lat = np.asarray(lat)
+    lng = np.asarray(lng)
+    return (lat >= min(lats)) & (lat <= max(lats)) & (lng >= min(lngs)) & (lng <= max(lngs))
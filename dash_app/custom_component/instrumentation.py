@@ -0,0 +1,275 @@
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+import inspect
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+import flask
+from dash.exceptions import PreventUpdate
+
+from .cache import MEMO_CACHES
+from .pattern_matching import output_index
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "dash_callback"
+
+
+def escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def callback_owner(func):
+    original = inspect.unwrap(func)
+    if hasattr(original, "__callback_owner__"):
+        return original.__callback_owner__
+    owner = None
+    for cell in original.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, type):
+            continue
+        if hasattr(value, "_index") or hasattr(value, "routes"):
+            owner = value
+            break
+    parts = original.__qualname__.split('.')
+    method = parts[-3] if len(parts) >= 3 and parts[-2] == '<locals>' else parts[-1]
+    if owner is None:
+        return parts[0], "", method
+    return owner.__class__.__name__, getattr(owner, "_index", ""), method
+
+
+@dataclass
+class CallbackStats:
+    callback_id: str
+    component_class: str
+    component: str
+    method: str
+    buckets: List[int] = field(default_factory=lambda: [0]*(len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    errors: int = 0
+    prevented: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def observe(self, seconds, request_bytes, response_bytes):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+
+    def merge(self, other: dict):
+        self.buckets = [a + b for a, b in zip(self.buckets, other["buckets"])]
+        self.count += other["count"]
+        self.total_seconds += other["total_seconds"]
+        self.max_seconds = max(self.max_seconds, other["max_seconds"])
+        self.errors += other["errors"]
+        self.prevented += other["prevented"]
+        self.request_bytes += other["request_bytes"]
+        self.response_bytes += other["response_bytes"]
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        target = q*self.count
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS + (self.max_seconds,), self.buckets):
+            seen += hits
+            if seen >= target:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    @property
+    def labels(self):
+        return (f'callback="{escape_label(self.callback_id)}",component_class="{escape_label(self.component_class)}",'
+                f'component="{escape_label(self.component)}",method="{escape_label(self.method)}"')
+
+    def summary(self):
+        calls = self.count or 1
+        return dict(
+            component_class=self.component_class,
+            component=self.component,
+            method=self.method,
+            calls=self.count,
+            errors=self.errors,
+            prevented=self.prevented,
+            mean_ms=1000*self.total_seconds/calls,
+            p50_ms=1000*self.quantile(0.5),
+            p95_ms=1000*self.quantile(0.95),
+            max_ms=1000*self.max_seconds,
+            total_s=self.total_seconds,
+            request_kb=self.request_bytes/calls/1024,
+            response_kb=self.response_bytes/calls/1024,
+        )
+
+
+@dataclass
+class CallbackMetrics:
+    stats: Dict[str, CallbackStats] = field(default_factory=dict)
+    state: Any = None
+    flush_interval: float = 1.0
+    _last_flush: float = field(init=False, default=0.0)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def share(self, state):
+        self.state = state
+
+    @property
+    def state_key(self):
+        return f"metrics:{os.getpid()}"
+
+    def flush(self, force=False):
+        if self.state is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.state.set(self.state_key, {callback_id: asdict(stats) for callback_id, stats in self.stats.items()})
+        self.state.set(f"memo:{os.getpid()}", self.local_memo_stats())
+
+    def merged_stats(self):
+        with self._lock:
+            if self.state is None:
+                return list(self.stats.values())
+            self.flush(force=True)
+        merged = {}
+        for _, snapshot in self.state.items("metrics:"):
+            for callback_id, stats in snapshot.items():
+                if callback_id not in merged:
+                    merged[callback_id] = CallbackStats(
+                        stats["callback_id"], stats["component_class"], stats["component"], stats["method"]
+                    )
+                merged[callback_id].merge(stats)
+        return list(merged.values())
+
+    @staticmethod
+    def local_memo_stats():
+        return {name: cache.stats for name, cache in MEMO_CACHES.items()}
+
+    def memo_summaries(self):
+        if self.state is None:
+            memo_stats = self.local_memo_stats()
+        else:
+            with self._lock:
+                self.flush(force=True)
+            memo_stats = {}
+            for _, snapshot in self.state.items("memo:"):
+                for name, stats in snapshot.items():
+                    merged = memo_stats.setdefault(name, dict(entries=0, bytes=0, hits=0, misses=0))
+                    for counter in merged:
+                        merged[counter] += stats[counter]
+        summaries = []
+        for name, stats in sorted(memo_stats.items()):
+            total = stats["hits"] + stats["misses"]
+            summaries.append(dict(
+                function=name,
+                entries=stats["entries"],
+                kb=stats["bytes"]/1024,
+                hits=stats["hits"],
+                misses=stats["misses"],
+                hit_rate=stats["hits"]/total if total else 0.0,
+            ))
+        return summaries
+
+    def wrap(self, callback_id, func):
+        component_class, component, method = callback_owner(func)
+        if '{' not in callback_id:
+            self.stats[callback_id] = CallbackStats(callback_id, component_class, component, method)
+
+        def matched_stats(outputs_list):
+            index = output_index(outputs_list)
+            key = callback_id if index is None else f"{callback_id}#{index}"
+            with self._lock:
+                if key not in self.stats:
+                    self.stats[key] = CallbackStats(callback_id, component_class, str(index), method)
+                return self.stats[key]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = matched_stats(kwargs.get("outputs_list"))
+            request_bytes = (flask.request.content_length or 0) if flask.has_request_context() else 0
+            start = time.perf_counter()
+            try:
+                response = func(*args, **kwargs)
+            except PreventUpdate:
+                with self._lock:
+                    stats.prevented += 1
+                    stats.observe(time.perf_counter() - start, request_bytes, 0)
+                    self.flush()
+                raise
+            except Exception:
+                with self._lock:
+                    stats.errors += 1
+                    stats.observe(time.perf_counter() - start, request_bytes, 0)
+                    self.flush()
+                raise
+            response_bytes = len(response) if isinstance(response, (str, bytes)) else 0
+            with self._lock:
+                stats.observe(time.perf_counter() - start, request_bytes, response_bytes)
+                self.flush()
+            return response
+        wrapper.__instrumented__ = True
+        return wrapper
+
+    def instrument(self, dash_app):
+        for callback_id, callback in dash_app.callback_map.items():
+            func = callback.get("callback")
+            if func is None or getattr(func, "__instrumented__", False):
+                continue
+            callback["callback"] = self.wrap(callback_id, func)
+        return dash_app
+
+    def summaries(self):
+        return [stats.summary() for stats in self.merged_stats()]
+
+    def render_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_PREFIX}_latency_seconds Callback latency in seconds.",
+            f"# TYPE {METRIC_PREFIX}_latency_seconds histogram",
+        ]
+        stats_list = self.merged_stats()
+        for stats in stats_list:
+            cumulative = 0
+            for bound, hits in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += hits
+                lines.append(f'{METRIC_PREFIX}_latency_seconds_bucket{{{stats.labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_latency_seconds_bucket{{{stats.labels},le="+Inf"}} {stats.count}')
+            lines.append(f'{METRIC_PREFIX}_latency_seconds_sum{{{stats.labels}}} {stats.total_seconds}')
+            lines.append(f'{METRIC_PREFIX}_latency_seconds_count{{{stats.labels}}} {stats.count}')
+        for name, attr, help_text in (
+            ("request_bytes_total", "request_bytes", "Callback request payload bytes."),
+            ("response_bytes_total", "response_bytes", "Callback response payload bytes."),
+            ("errors_total", "errors", "Callbacks that raised an exception."),
+            ("prevented_total", "prevented", "Callbacks that prevented the update."),
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} counter")
+            for stats in stats_list:
+                lines.append(f'{METRIC_PREFIX}_{name}{{{stats.labels}}} {getattr(stats, attr)}')
+        memo_summaries = self.memo_summaries()
+        for name, key, metric_type, help_text in (
+            ("memo_hits_total", "hits", "counter", "Memoized calls served from cache."),
+            ("memo_misses_total", "misses", "counter", "Memoized calls that had to be computed."),
+            ("memo_entries", "entries", "gauge", "Entries held by the memo cache."),
+            ("memo_kilobytes", "kb", "gauge", "Size of the memo cache in KB."),
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            for summary in memo_summaries:
+                lines.append(f'{METRIC_PREFIX}_{name}{{function="{escape_label(summary["function"])}"}} {summary[key]}')
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return flask.Response(self.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+CALLBACK_METRICS = CallbackMetrics()
@@ -0,0 +1,37 @@
+from typing import Any, Callable, Dict, Hashable
+from weakref import WeakKeyDictionary
+
+from dash import MATCH, Dash, ctx
+
+REGISTERED_PATTERNS = WeakKeyDictionary()
+PATTERN_INSTANCES = WeakKeyDictionary()
+
+
+def matching(component_id: dict):
+    return {key: value if key == "type" else MATCH for key, value in component_id.items()}
+
+
+def register_once(dash_app: Dash, key: Hashable, register: Callable[[Dash], None]):
+    registered = REGISTERED_PATTERNS.setdefault(dash_app, set())
+    if key in registered:
+        return False
+    registered.add(key)
+    register(dash_app)
+    return True
+
+
+def pattern_instances(dash_app: Dash, key: Hashable) -> Dict[str, Any]:
+    return PATTERN_INSTANCES.setdefault(dash_app, {}).setdefault(key, {})
+
+
+def output_index(outputs):
+    while isinstance(outputs, list) and outputs:
+        outputs = outputs[0]
+    if isinstance(outputs, dict) and isinstance(outputs.get("id"), dict):
+        return outputs["id"].get("index")
+    return None
+
+
+def matched_index():
+    index = output_index(ctx.outputs_list)
+    return ctx.triggered_id["index"] if index is None else index
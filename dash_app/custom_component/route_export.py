@@ -0,0 +1,151 @@
+import io
+import json
+from typing import Dict, Iterable, List, Set, Tuple
+import zipfile
+
+from .distance_matrix import load_matrix
+from .feasibility import check_feasibility
+
+LOCATION_KEYS = ("LocationCode", "locationCode")
+CUSTOMER_KEYS = ("CustomerCode", "customerCode")
+DEPOT_KEYS = ("DepotCode", "depotCode")
+
+
+def collect_codes(value, suffixes: Tuple[str, ...], found: Set[str] = None) -> Set[str]:
+    found = set() if found is None else found
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str):
+                if key.endswith(suffixes):
+                    found.add(item)
+            elif isinstance(item, (dict, list)):
+                collect_codes(item, suffixes, found)
+    elif isinstance(value, list):
+        for item in value:
+            collect_codes(item, suffixes, found)
+    return found
+
+
+def build_distance_index(distances: List[dict]):
+    distances = sorted(distances, key=lambda row: row["srcCode"])
+    index = {}
+    for i, row in enumerate(distances):
+        start, _ = index.get(row["srcCode"], (i, i))
+        index[row["srcCode"]] = (start, i + 1)
+    return distances, index
+
+
+def subset_distances(distances: List[dict], index: Dict[str, Iterable[int]], codes: Set[str]):
+    if index is None:
+        return [row for row in distances if row["srcCode"] in codes and row["destCode"] in codes]
+    subset = []
+    for code in codes:
+        if code not in index:
+            continue
+        start, stop = index[code]
+        subset.extend(row for row in distances[start:stop] if row["destCode"] in codes)
+    return subset
+
+
+class MatrixExpiredError(LookupError):
+    pass
+
+
+def session_distances(cur_data: dict, codes: Set[str] = None):
+    key = cur_data.get("distanceMatrix")
+    if key is not None:
+        matrix = load_matrix(key)
+        if matrix is None:
+            raise MatrixExpiredError("The distance matrix of this session has expired, upload the JSON input again.")
+        return matrix.to_rows(codes)
+    if codes is None:
+        return cur_data["distances"]
+    return subset_distances(cur_data["distances"], cur_data.get("distanceIndex"), codes)
+
+
+def route_entities(cur_data: dict, requests: List[dict], vehicles: List[dict]):
+    referenced = [requests, vehicles]
+    customer_codes = collect_codes(referenced, CUSTOMER_KEYS)
+    depot_codes = collect_codes(referenced, DEPOT_KEYS)
+    codes = collect_codes(referenced, LOCATION_KEYS)
+    customers = [
+        customer for customer in cur_data["customers"]
+        if customer.get("customerCode") in customer_codes or customer.get("locationCode") in codes
+    ]
+    depots = [
+        depot for depot in cur_data["depots"]
+        if depot.get("depotCode") in depot_codes or depot.get("locationCode") in codes
+    ]
+    codes = collect_codes([customers, depots], LOCATION_KEYS, codes)
+    return dict(
+        customers=customers,
+        depots=depots,
+        locations=[location for location in cur_data["locations"] if location.get("locationCode") in codes],
+        distances=session_distances(cur_data, codes),
+    )
+
+
+def route_payload(value, cur_data: dict):
+    if value != "all":
+        requests = [
+            dict(req, assignedVehicle=None, tripNo=value)
+            for req in cur_data["tripRequest"].get(value, {}).values()
+        ]
+        vehicles = cur_data["tripVehicle"].get(value, [])
+        entities = route_entities(cur_data, requests, vehicles)
+    else:
+        requests = []
+        vehicles = []
+        for vendor in cur_data["vehicles"].values():
+            for veh in vendor.values():
+                vehicles += veh
+        assignment = cur_data.get("tripAssignment") or check_feasibility(cur_data).assignment()
+        for key, trip in cur_data["tripRequest"].items():
+            vehicle_code = assignment.get(key)
+            requests += [
+                dict(req, orderCode=req["orderCode"] + key, assignedVehicle=vehicle_code, tripNo=key)
+                for req in trip.values()
+            ]
+        requests += list(req for req in cur_data["requests"].values() if len(req["items"]))
+        entities = dict(
+            customers=cur_data["customers"],
+            depots=cur_data["depots"],
+            locations=cur_data["locations"],
+            distances=session_distances(cur_data),
+        )
+    return dict(
+        customers=entities["customers"],
+        depots=entities["depots"],
+        distances=entities["distances"],
+        locations=entities["locations"],
+        matrixConfig=cur_data["matrixConfig"],
+        algoParams=cur_data["algoParams"],
+        routingFee=cur_data["routingFee"],
+        requests=requests,
+        vehicles=vehicles,
+    )
+
+
+def stamp_payload(payload: dict, name: str, value):
+    algo_params = dict(payload["algoParams"])
+    algo_params["trackingId"] = f'{algo_params["trackingId"]}_{name}_{value}'
+    return dict(payload, algoParams=algo_params)
+
+
+def build_payload(value, cur_data: dict, name: str):
+    return stamp_payload(route_payload(value, cur_data), name, value)
+
+
+def encode_route(value, cur_data: dict, name: str):
+    return json.dumps(build_payload(value, cur_data, name)).encode("utf-8")
+
+
+def export_archive(cur_data: dict, name: str, progress=None) -> bytes:
+    values = [*cur_data["tripRequest"], "all"]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, value in enumerate(values, 1):
+            archive.writestr(f"{name}_{value}.json", encode_route(value, cur_data, name))
+            if progress is not None:
+                progress(i, len(values))
+    return buffer.getvalue()
@@ -5,7 +5,7 @@ from .component_register import component_register
 import dash_mantine_components as dmc
 
 import dash_bootstrap_components as dbc
-from dash import Dash, html, Input, Output, State, ctx, dcc
+from dash import Dash, html, Input, Output, State, ctx, dcc, no_update
 
 @dataclass
 @component_register
@@ -52,6 +52,7 @@ class SharedDataStep(FullyStructuredComponent):
 @component_register
 class StepperNavigationRoute(Route):
     children: List[FullyStructuredComponent] = None
+    lazy_steps: bool = False
     min_step: int = field(init=False, default=0)
     max_step: int = field(init=False)
     active: int = field(init=False, default=0)
@@ -80,6 +81,18 @@ class StepperNavigationRoute(Route):
     def back_btn(self):
         return dmc.Button("Back", id=self.back_id, variant="default", disabled=True)
     
+    @property
+    def rendered_id(self):
+        return f"{self.index}-rendered"
+    
+    def content_id(self, child):
+        return f"{child.nav_id}-content"
+    
+    def step_content(self, i, child):
+        if not self.lazy_steps:
+            return child.layout
+        return html.Div(id=self.content_id(child), children=child.layout if i == self.active else None)
+    
     def stepper_step(self):
         stepper_step = []
         for i, child in enumerate(self.children):
@@ -88,7 +101,7 @@ class StepperNavigationRoute(Route):
                         id = child.nav_id,
                         label=f'{STEP_LABEL[i]}',
                         description=child.name,
-                        children=child.layout,
+                        children=self.step_content(i, child),
                         allowStepSelect=False,
                     ),
                 )
@@ -97,6 +110,7 @@ class StepperNavigationRoute(Route):
     def make_layout(self):
         return html.Div([
             dcc.Store(id='session-storage', storage_type='session'),
+            dcc.Store(id=self.rendered_id, data=[self.active]) if self.lazy_steps else None,
             dmc.Container(
                 [
                     dmc.Stepper(
@@ -133,6 +147,16 @@ class StepperNavigationRoute(Route):
                 return step, False, True
         return update
     
+    def render_step(self):
+        def render(active, rendered):
+            rendered = rendered or []
+            if active is None or active >= self.max_step or active in rendered:
+                return [no_update]*(self.max_step + 1)
+            contents = [no_update]*self.max_step
+            contents[active] = self.children[active].layout
+            return contents + [rendered + [active]]
+        return render
+    
     def register_callback(self, dash_app: Dash):
         super().register_callback(dash_app)
         dash_app.callback(
@@ -143,4 +167,12 @@ class StepperNavigationRoute(Route):
             Input(self.next_id, "n_clicks"),
             State(self.index, "active"),
             prevent_initial_call=True,
-        )(self.update_step())
\ No newline at end of file
+        )(self.update_step())
+        if self.lazy_steps:
+            dash_app.callback(
+                *[Output(self.content_id(child), "children") for child in self.children],
+                Output(self.rendered_id, "data"),
+                Input(self.index, "active"),
+                State(self.rendered_id, "data"),
+                prevent_initial_call=True,
+            )(self.render_step())
\ No newline at end of file
@@ -0,0 +1,144 @@
+from dataclasses import fields
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from .component_register import COMPONENT_CLASS, COMPONENT_MODULES, discover, module_origin
+
+SCHEMA_CACHE_PATH = os.getcwd() + '/dash_app/.cache/schema/'
+COMPILED_VERSION = 1
+SIMPLE_TYPES = (str, int, float, bool)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def init_fields(cls):
+    return {f.name: f for f in fields(cls) if f.init and f.name != "children"}
+
+
+def module_digest(spec):
+    with open(module_origin(spec), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def registry_fingerprint():
+    discover()
+    modules = {module: module_digest(module) for module in sorted(set(COMPONENT_MODULES.values()))}
+    return json.dumps([COMPILED_VERSION, sorted(COMPONENT_MODULES.items()), modules], sort_keys=True)
+
+
+def referenced_types(node):
+    if node is None:
+        return set()
+    if isinstance(node, list):
+        return set().union(*(referenced_types(child) for child in node))
+    return {node["type"]} | referenced_types(node["children"])
+
+
+def schema_hash(raw_schema: bytes):
+    digest = hashlib.sha256(raw_schema)
+    digest.update(registry_fingerprint().encode('utf-8'))
+    return digest.hexdigest()
+
+
+def check_value(cls, name, field_def, value, path):
+    expected = field_def.type
+    if expected not in SIMPLE_TYPES or value is None:
+        return value
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+        raise SchemaError(f"{path}.{name}: {cls.__name__} expects {expected.__name__}, got {type(value).__name__}")
+    return value
+
+
+def compile_component(config: Dict[str, Any], default_type: str = "BaseComponent", path: str = "$") -> Dict[str, Any]:
+    if not isinstance(config, dict):
+        raise SchemaError(f"{path}: component config must be an object, got {type(config).__name__}")
+    config = dict(config)
+    cls_type = config.pop("type", None) or default_type
+    cls = COMPONENT_CLASS.get(cls_type)
+    if cls is None:
+        raise SchemaError(f"{path}: unknown component type '{cls_type}'")
+    children_config = config.pop("children", "")
+    allowed = init_fields(cls)
+    unknown = sorted(set(config) - set(allowed))
+    if unknown:
+        raise SchemaError(f"{path}: {cls_type} has no field(s) {', '.join(unknown)}")
+    index = config.get("_index", "")
+    if not isinstance(index, str):
+        raise SchemaError(f"{path}._index: expected str, got {type(index).__name__}")
+    compiled_fields = {name: check_value(cls, name, allowed[name], value, path) for name, value in config.items()}
+    if isinstance(children_config, str):
+        children = dict(type="BaseComponent", fields=dict(name='', _index=f'{index}-content'), children=None)
+    elif isinstance(children_config, list):
+        children = []
+        for i, child_config in enumerate(children_config):
+            child_path = f"{path}.children[{i}]"
+            if not isinstance(child_config, dict) or "type" not in child_config:
+                raise SchemaError(f"{child_path}: list children must be objects with a 'type'")
+            child_config = dict(child_config, _index=f'{index}-{child_config.get("_index", "")}')
+            children.append(compile_component(child_config, path=child_path))
+    elif isinstance(children_config, dict):
+        if "type" not in children_config:
+            raise SchemaError(f"{path}.children: child object must have a 'type'")
+        children = compile_component(children_config, path=f"{path}.children")
+    else:
+        raise SchemaError(f"{path}.children: expected str, list or object, got {type(children_config).__name__}")
+    return dict(type=cls_type, fields=compiled_fields, children=children)
+
+
+def compile_schema(app_schema: Dict[str, Any]) -> Dict[str, Any]:
+    from .base_component import Route
+    routes = app_schema.get("routes") if isinstance(app_schema, dict) else None
+    if not isinstance(routes, list):
+        raise SchemaError("$.routes: expected a list of routes")
+    compiled_routes = []
+    hrefs = set()
+    for i, route in enumerate(routes):
+        path = f"$.routes[{i}]"
+        node = compile_component(route, default_type="Route", path=path)
+        if not issubclass(COMPONENT_CLASS[node["type"]], Route):
+            raise SchemaError(f"{path}: {node['type']} is not a Route")
+        href = node["fields"].get("href", "")
+        if href in hrefs:
+            raise SchemaError(f"{path}.href: duplicate href '{href}'")
+        hrefs.add(href)
+        compiled_routes.append(node)
+    return dict(version=COMPILED_VERSION, routes=compiled_routes)
+
+
+def build_component(node: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]):
+    if node is None:
+        return None
+    if isinstance(node, list):
+        return [build_component(child) for child in node]
+    cls = COMPONENT_CLASS[node["type"]]
+    return cls(children=build_component(node["children"]), **node["fields"])
+
+
+def load_compiled_schema(schema_path: str, cache_path: str = SCHEMA_CACHE_PATH) -> Dict[str, Any]:
+    with open(schema_path, 'rb') as f:
+        raw_schema = f.read()
+    key = schema_hash(raw_schema)
+    cache_file = os.path.join(cache_path, f'{key}.json') if cache_path else ''
+    if cache_file:
+        try:
+            with open(cache_file) as f:
+                compiled = json.load(f)
+            compiled["hash"] = key
+            return compiled
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+    compiled = compile_schema(json.loads(raw_schema))
+    if cache_file:
+        os.makedirs(cache_path, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(compiled, f)
+        os.replace(tmp_file, cache_file)
+    compiled["hash"] = key
+    return compiled
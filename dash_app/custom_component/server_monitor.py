@@ -4,9 +4,10 @@ import math
 from typing import List
 from .base_component import *
 from .component_register import component_register
+from .instrumentation import CALLBACK_METRICS
+from .shared_state import SharedState, shared_state, worker_count
 import dash_mantine_components as dmc
 
-import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import Dash, html, Input, Output, State, dcc, ctx
 from plotly import graph_objects as go
@@ -31,14 +32,38 @@ class LiveUpdateFigure(FullyStructuredComponent):
     max_ticks: int = 20
     max_data_range: int = field(init=False)
     data: list[dict] = field(init=False)
+    state: SharedState = field(init=False, default=None)
     
     def __post_init__(self):
         super().__post_init__()
         self.max_data_range = 2*self.window_size
         self.data = [None for _ in range(self.max_data_range)]
+        if worker_count() > 1:
+            self.state = shared_state()
+    
+    @property
+    def state_key(self):
+        return f"live-update:{self._index}"
+    
+    def push_data(self, n, sample):
+        def push(data):
+            if data is None or len(data) != self.max_data_range:
+                data = [None for _ in range(self.max_data_range)]
+            cur_index = n%self.window_size
+            data[cur_index] = data[cur_index + self.window_size] = sample
+            return data
+        if self.state is None:
+            return push(self.data)
+        return self.state.update(self.state_key, push)
+    
+    def reset_data(self):
+        self.data = [None for _ in range(self.max_data_range)]
+        if self.state is not None:
+            self.state.delete(self.state_key)
     
     
     def get_current_data(self, n):
+        import pandas as pd
         now = datetime.now(timezone.utc) + timedelta(seconds=7*3600)
         run_time = now.strftime('%H:%M')
         mem = psutil.virtual_memory()
@@ -46,12 +71,12 @@ class LiveUpdateFigure(FullyStructuredComponent):
         cpu_percent = psutil.cpu_percent(interval=0.1)
         # per_cpu = psutil.cpu_percent(interval=0.1, percpu=True)
         cur_index = n%self.window_size
-        self.data[cur_index] = self.data[cur_index + self.window_size ] = {
+        data = self.push_data(n, {
             "Time": run_time,
             "Memory Usage": men_percent,
             "CPU Usage": cpu_percent,
-        }
-        cur_data = self.data[cur_index + 1:cur_index + self.window_size + 1]
+        })
+        cur_data = data[cur_index + 1:cur_index + self.window_size + 1]
         df = pd.DataFrame.from_records([_d for _d in cur_data if _d is not None])
         return df
 
@@ -153,7 +178,7 @@ class LiveUpdateFigure(FullyStructuredComponent):
             if triggered_id == self.start_btn:
                 return False, True
             elif triggered_id == self.stop_btn:
-                self.data = [None for _ in range(self.max_data_range)]
+                self.reset_data()
                 return True, False
             return False, True
         return func
@@ -171,4 +196,60 @@ class LiveUpdateFigure(FullyStructuredComponent):
             Input(self.start_btn, "n_clicks"),
             Input(self.stop_btn, "n_clicks"),
             prevent_initial_call=True,
-        )(self.monitor_control())
\ No newline at end of file
+        )(self.monitor_control())
+
+
+@dataclass
+@component_register
+class CallbackMonitor(FullyStructuredComponent):
+    interval: int = 5000
+    max_rows: int = 50
+    
+    @property
+    def table_id(self):
+        return f"{self._index}-table"
+    
+    @property
+    def interval_index(self):
+        return f"{self._index}-itv"
+    
+    @property
+    def header(self):
+        return html.H1(self.name)
+    
+    @property
+    def nav(self):
+        return html.Div([
+            html.A("Prometheus metrics", href="/metrics", target="_blank"),
+            dcc.Interval(id=self.interval_index, interval=self.interval, n_intervals=0),
+        ])
+    
+    @property
+    def body(self):
+        return html.Div(id=self.table_id)
+    
+    @property
+    def footer(self):
+        return
+    
+    def update_table(self):
+        def func(n):
+            import pandas as pd
+            summaries = [s for s in CALLBACK_METRICS.summaries() if s["calls"]]
+            if not summaries:
+                return html.Div("No callback has been called yet.")
+            df = pd.DataFrame.from_records(summaries).sort_values("total_s", ascending=False).head(self.max_rows)
+            children = [dbc.Table.from_dataframe(df.round(2), striped=True, bordered=True, hover=True, size="sm")]
+            memo_summaries = [s for s in CALLBACK_METRICS.memo_summaries() if s["hits"] + s["misses"]]
+            if memo_summaries:
+                memo_df = pd.DataFrame.from_records(memo_summaries)
+                children += [html.H4("Memoized functions"), dbc.Table.from_dataframe(memo_df.round(2), striped=True, bordered=True, hover=True, size="sm")]
+            return html.Div(children)
+        return func
+    
+    def register_callback(self, dash_app: Dash):
+        super().register_callback(dash_app)
+        dash_app.callback(
+            Output(self.table_id, "children"),
+            Input(self.interval_index, "n_intervals"),
+        )(self.update_table())
\ No newline at end of file
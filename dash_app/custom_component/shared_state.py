@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Any, Callable, Iterable
+
+DEFAULT_STATE_PATH = '/dev/shm/dash_app_state.sqlite' if os.path.isdir('/dev/shm') else os.getcwd() + '/dash_app/.cache/state.sqlite'
+STATE_PATH = os.environ.get('DASH_SHARED_STATE', DEFAULT_STATE_PATH)
+
+
+class UnsafeSharedStateError(RuntimeError):
+    pass
+
+
+def worker_count():
+    try:
+        import uwsgi
+        return int(uwsgi.numproc)
+    except ImportError:
+        return int(os.environ.get('DASH_WORKERS', '1'))
+
+
+def thread_count():
+    try:
+        import uwsgi
+        return int(uwsgi.opt.get('threads', 1) or 1)
+    except ImportError:
+        return int(os.environ.get('DASH_THREADS', '1'))
+
+
+@dataclass
+class SharedState:
+    path: str = STATE_PATH
+    timeout: float = 30.0
+    _local: threading.local = field(init=False, repr=False, default_factory=threading.local)
+
+    def __post_init__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB)")
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str, default: Any = None):
+        row = self.connection().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        self.connection().execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def delete(self, key: str):
+        self.connection().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def update(self, key: str, func: Callable[[Any], Any]):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+            value = func(None if row is None else pickle.loads(row[0]))
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def items(self, prefix: str = ''):
+        rows = self.connection().execute(
+            "SELECT key, value FROM state WHERE key >= ? AND key < ?", (prefix, prefix + '￿')
+        ).fetchall()
+        return [(key, pickle.loads(value)) for key, value in rows]
+
+
+_SHARED_STATE = None
+_SHARED_STATE_LOCK = threading.Lock()
+
+
+def shared_state():
+    global _SHARED_STATE
+    with _SHARED_STATE_LOCK:
+        if _SHARED_STATE is None:
+            _SHARED_STATE = SharedState()
+        return _SHARED_STATE
+
+
+def check_process_safety(components: Iterable, workers: int = None, threads: int = None):
+    workers = worker_count() if workers is None else workers
+    threads = thread_count() if threads is None else threads
+    if workers <= 1 and threads <= 1:
+        return
+    unsafe_processes, unsafe_threads = [], []
+    for root in components:
+        for component in root.walk():
+            name = f"{component.__class__.__name__}({component._index})"
+            if workers > 1 and not component.process_safe:
+                unsafe_processes.append(name)
+            if threads > 1 and not component.thread_safe:
+                unsafe_threads.append(name)
+    if unsafe_processes:
+        raise UnsafeSharedStateError(
+            f"{workers} workers configured but these components keep per-process mutable state: {', '.join(unsafe_processes)}. "
+            "Enable their shared backend in app_schema.json or run with a single worker."
+        )
+    if unsafe_threads:
+        raise UnsafeSharedStateError(
+            f"{threads} threads per worker configured but these components keep per-request state on a shared "
+            f"instance: {', '.join(unsafe_threads)}. Run with threads = 1."
+        )
@@ -0,0 +1,45 @@
+import pickle
+from typing import Any
+
+from dash import Patch
+
+
+def snapshot(value: Any):
+    return pickle.loads(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def same(a: Any, b: Any):
+    if a == b:
+        return True
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    return False
+
+
+def diff_patch(old: Any, new: Any, patch: Patch = None) -> Patch:
+    patch = Patch() if patch is None else patch
+    for key in old.keys() - new.keys():
+        del patch[key]
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        before = old[key]
+        if same(before, value):
+            continue
+        if isinstance(before, dict) and isinstance(value, dict):
+            diff_patch(before, value, patch[key])
+        elif isinstance(before, list) and isinstance(value, list) and len(value) > len(before) \
+                and same(value[:len(before)], before):
+            patch[key].extend(value[len(before):])
+        else:
+            patch[key] = value
+    return patch
+
+
+def store_update(old: Any, new: Any):
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    return diff_patch(old, new)
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import codecs
+from dataclasses import dataclass, field
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+LOCATIONS_KEY = re.compile(rb'"locations"\s*:')
+STREAM_REJECTED = (400, 411, 413, 415)
+
+
+def extract_locations(raw_data: bytes):
+    raw_data = raw_data.removeprefix(codecs.BOM_UTF8)
+    match = LOCATIONS_KEY.search(raw_data)
+    if match is not None:
+        tail = raw_data[match.end():].decode('utf-8').lstrip()
+        try:
+            locations, _ = json.JSONDecoder().raw_decode(tail)
+            if isinstance(locations, list):
+                return locations
+        except json.JSONDecodeError:
+            pass
+    return json.loads(raw_data.decode('utf-8'))["locations"]
+
+
+@dataclass
+class StageTimer:
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+@dataclass
+class PipelineResult:
+    id: str
+    raw_data: Optional[bytes] = None
+    validation: Optional[dict] = None
+    locations: Optional[List[dict]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return self.validation is not None and self.locations is not None
+
+
+@dataclass
+class FetchValidatePipeline:
+    data_server: str
+    validate_server: str
+    chunk_size: int = 1 << 16
+    max_workers: int = 4
+    stream_validate: bool = True
+    _io_pool: ThreadPoolExecutor = field(init=False, repr=False)
+    _batch_pool: ThreadPoolExecutor = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._io_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="validate-io")
+        self._batch_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="validate-batch")
+
+    @property
+    def input_api(self):
+        return f"{self.data_server}/data/input"
+
+    @property
+    def validate_api(self):
+        return f"{self.validate_server}/vrp/validate"
+
+    @staticmethod
+    def read_validation(response):
+        if response.status_code != 400:
+            return None
+        content = json.loads(response.content)
+        if "distanceErrors" not in content:
+            return None
+        return content
+
+    def post_validate(self, body, timer: StageTimer):
+        with timer.stage("validate"):
+            response = requests.post(self.validate_api, data=body, headers={"Content-Type": "application/json"})
+        return response
+
+    def stream_body(self, response, buffer: bytearray, downloaded: threading.Event, timer: StageTimer):
+        start = time.perf_counter()
+        try:
+            first = True
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if first:
+                    chunk = chunk.removeprefix(codecs.BOM_UTF8)
+                    first = False
+                buffer.extend(chunk)
+                yield chunk
+        finally:
+            timer.add("download", time.perf_counter() - start)
+            downloaded.set()
+
+    def run(self, id, timer: StageTimer = None) -> PipelineResult:
+        timer = timer or StageTimer()
+        result = PipelineResult(id=id, timings=timer.timings)
+        start = time.perf_counter()
+        with timer.stage("connect"):
+            response = requests.get(f"{self.input_api}/{id}", stream=True)
+        if response.status_code != 200:
+            response.close()
+            return result
+        buffer = bytearray()
+        if self.stream_validate:
+            downloaded = threading.Event()
+            body = self.stream_body(response, buffer, downloaded, timer)
+            validate_future = self._io_pool.submit(self.post_validate, body, timer)
+            while not downloaded.wait(0.05):
+                if validate_future.done():
+                    for _ in body:
+                        pass
+        else:
+            with timer.stage("download"):
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    buffer.extend(chunk)
+            validate_future = self._io_pool.submit(self.post_validate, bytes(buffer), timer)
+        result.raw_data = bytes(buffer)
+        try:
+            with timer.stage("parse_locations"):
+                result.locations = extract_locations(result.raw_data)
+            response_validate = validate_future.result()
+            validation = self.read_validation(response_validate)
+            if validation is None and self.stream_validate and response_validate.status_code in STREAM_REJECTED:
+                validation = self.read_validation(self.post_validate(result.raw_data, timer))
+            result.validation = validation
+        finally:
+            response.close()
+            timer.add("total", time.perf_counter() - start)
+        return result
+
+    def map(self, fn, ids: List[str]) -> Dict[str, object]:
+        return dict(zip(ids, self._batch_pool.map(fn, ids)))
+
+    def run_many(self, ids: List[str]) -> Dict[str, PipelineResult]:
+        return self.map(self.run, ids)
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+import json
+import threading
+from typing import Any, Dict
+
+from plotly.io.json import to_json_plotly
+
+
+@dataclass
+class CachedLayout:
+    source: Any
+    children: Any
+
+
+@dataclass
+class LayoutCache:
+    hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    _entries: Dict[str, CachedLayout] = field(init=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def serialize(self, layout):
+        return CachedLayout(source=layout, children=json.loads(to_json_plotly(layout)))
+
+    def get(self, href: str, layout):
+        entry = self._entries.get(href)
+        if entry is not None and entry.source is layout:
+            self.hits += 1
+            return entry.children
+        with self._lock:
+            self.misses += 1
+            entry = self.serialize(layout)
+            self._entries[href] = entry
+        return entry.children
+
+    def invalidate(self, href: str = None):
+        with self._lock:
+            if href is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(href, None)
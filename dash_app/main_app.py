@@ -7,10 +7,14 @@ import dash
 from dash import Dash, html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
-from .custom_component import PageNotFoundError, Route
+from .custom_component import (
+    CALLBACK_METRICS, UPLOAD_SPOOL, PageNotFoundError, Route, ThreadPoolManager, check_process_safety,
+    load_compiled_schema, shared_state, upload_owner, worker_count,
+)
+from .layout_cache import LayoutCache
 
 from .style import *
-from flask import Flask
+from flask import Flask, request
 
 dash._dash_renderer._set_react_version('18.2.0')
 
@@ -21,6 +25,9 @@ APP_SHORTNAME = 'SuperVRP'
 stylesheets=[dbc.themes.CYBORG]
 
 BASE_URL = "/"
+BACKGROUND_WORKERS = 4
+BACKGROUND_RESULT_TTL = 600
+CONDITIONAL_PATHS = ["_dash-layout", "_dash-dependencies"]
 
 @dataclass
 class MainApp:
@@ -32,10 +39,19 @@ class MainApp:
     app_path: str = PATH
     app_url: str = BASE_URL
     external_stylesheets: List = field(default_factory=list)
+    schema_hash: str = ''
     dash_app: Dash = field(init=False)
+    layout_cache: LayoutCache = field(init=False)
+    background_manager: ThreadPoolManager = field(init=False)
     
     def __post_init__(self):
         self.external_stylesheets = stylesheets
+        self.background_manager = ThreadPoolManager(
+            max_workers=BACKGROUND_WORKERS,
+            cache_by=[lambda: self.schema_hash, upload_owner],
+            expire=BACKGROUND_RESULT_TTL,
+            state=shared_state() if worker_count() > 1 else None,
+        )
         self.dash_app = Dash(
             server=self.flask_app,
             name=self.name,
@@ -43,8 +59,10 @@ class MainApp:
             assets_folder=self.assets_path,
             external_stylesheets=self.external_stylesheets,
             title=self.title,
+            background_callback_manager=self.background_manager,
         )
         self.dash_app.layout = dmc.MantineProvider(children=self.layout, theme={"colorScheme": "dark"})
+        self.layout_cache = LayoutCache()
         
     @property
     def assets_path(self):
@@ -91,18 +109,33 @@ class MainApp:
                     self.content,
                 ])
     
+    def find_route(self, pathname: str):
+        if not pathname or pathname == self.app_url or self.app_url not in pathname:
+            return None
+        pathname = pathname.removeprefix(self.app_url)
+        for route in self.routes:
+            if route.href == pathname:
+                return route
+        return None
+    
     def render_page_content(self):
         def func(pathname: str):
             if pathname == self.app_url or self.app_url not in pathname:
                 return
-            pathname = pathname.removeprefix(self.app_url)
-            for route in self.routes:
-                if route.href == pathname:
-                    return route.layout
+            route = self.find_route(pathname)
+            if route is not None:
+                return self.layout_cache.get(route.href, route.layout)
             else:
-                return PageNotFoundError(path_name=pathname).layout
+                return PageNotFoundError(path_name=pathname.removeprefix(self.app_url)).layout
         return func
     
+    def conditional_get(self, response):
+        if request.method == "GET" and request.path.removeprefix(self.app_url) in CONDITIONAL_PATHS and response.status_code == 200:
+            response.add_etag()
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+        return response
+    
     def register_callback(self):
         for route in self.routes:
             route.register_callback(self.dash_app)
@@ -110,14 +143,24 @@ class MainApp:
             Output("page-content", "children"),
             Input("url", "pathname")
         )(self.render_page_content())
+        self.dash_app.server.after_request(self.conditional_get)
+        CALLBACK_METRICS.instrument(self.dash_app)
+        if worker_count() > 1:
+            CALLBACK_METRICS.share(shared_state())
+        self.dash_app.server.add_url_rule(
+            f"{self.app_url}metrics",
+            "callback_metrics",
+            CALLBACK_METRICS.metrics_view,
+        )
+        UPLOAD_SPOOL.register(self.dash_app.server, self.app_url)
         
 def create_dash_application(flask_app):
     # component = dmc.MantineProvider(forceColorScheme="dark")
-    with open(f'{PATH}/app_schema.json') as f:
-        app_schema = json.load(f)
+    app_schema = load_compiled_schema(f'{PATH}/app_schema.json')
     routes = []
     for route in app_schema["routes"]:
-        routes.append(Route.from_config(route))
-    main_app = MainApp(flask_app=flask_app, routes=routes)
+        routes.append(Route.from_compiled(route))
+    check_process_safety(routes)
+    main_app = MainApp(flask_app=flask_app, routes=routes, schema_hash=app_schema["hash"])
     main_app.register_callback()
     return main_app.dash_app
\ No newline at end of file
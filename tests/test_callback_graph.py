@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks.callback_graph import ROOT, run
+from benchmarks.loadtest import load_scenario
+
+UPLOAD_JSON_BUDGET_KB = 3*1024
+
+
+@pytest.fixture(scope="module")
+def report():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)
+        monkeypatch.syspath_prepend(ROOT)
+        yield run(load_scenario("fixed_route"))
+
+
+def test_no_read_only_inputs(report):
+    assert report["read_only_inputs"] == []
+
+
+def test_no_pattern_candidates(report):
+    assert report["pattern_candidates"] == []
+
+
+def test_no_duplicate_outputs(report):
+    assert report["duplicate_outputs"] == []
+
+
+def test_fan_out_targets(report):
+    targets = {item["input"]: item["callbacks"] for item in report["fan_out"]}
+    assert targets == {
+        "uploader-fixed-route-json.contents": ["JsonUploader.uploader"],
+        "session-storage.data": ["Downloader.selecter"],
+    }
+
+
+def test_upload_json_payload_budget(report):
+    interactions = {item["step"]: item for item in report["interactions"]}
+    upload = interactions["upload json"]
+    assert upload["callbacks"] == ["Downloader.selecter", "JsonUploader.uploader"]
+    assert upload["request_kb"] < UPLOAD_JSON_BUDGET_KB
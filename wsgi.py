@@ -1,4 +1,8 @@
+import gc
+
 from app import app
 
+gc.freeze()
+
 if __name__ == "__main__":
     app.run()
\ No newline at end of file